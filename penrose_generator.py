@@ -732,6 +732,7 @@ def main():
         # Initialize ProceduralRenderer after OpenGL context is created
         renderer = ProceduralRenderer()
         renderer.render_scale = max(0.25, min(1.0, args.render_scale))
+        renderer.apply_settings(config_data)
         logger.info(f"Render scale: {renderer.render_scale} ({int(renderer.render_scale*100)}% resolution)")
         if args.no_overlay:
             renderer.interaction_overlay_enabled = False
@@ -914,6 +915,7 @@ def main():
             if update_event.is_set():
                 update_event.clear()
                 config_data = op.read_config_file(CONFIG_PATH)
+                renderer.apply_settings(config_data)
             if toggle_shader_event.is_set():
                 toggle_shader_event.clear()
                 _start_shader_fade()
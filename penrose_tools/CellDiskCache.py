@@ -0,0 +1,175 @@
+# penrose_tools/CellDiskCache.py
+"""
+Optional on-disk cache of generated overlay world cells.
+- Cells are grouped into square blocks of BLOCK x BLOCK cells, one .npy per
+  (gamma, block): per-cell files cost more to open than the cell costs to
+  generate, so a block is the unit of I/O
+- Each file is a structured array of tiles: the cell they belong to, their
+  exact lattice columns (r, s, k) and their last pattern columns
+- Files live under <directory>/v<FORMAT_VERSION>/<gamma hash>/, and a file
+  whose dtype doesn't match the current record layout is ignored, so stale
+  formats never load
+- Files are read memory-mapped and copied out, written atomically, and
+  evicted least-recently-used (by mtime, refreshed on read) past a size cap
+"""
+import hashlib
+import logging
+import os
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# Cells per block side
+BLOCK = 8
+
+# One record per tile; a record with r == -1 marks a generated empty cell
+_RECORD = np.dtype([
+    ('cell', np.int16),          # (cy % BLOCK) * BLOCK + cx % BLOCK
+    ('r', np.int8),
+    ('s', np.int8),
+    ('k', np.int32, (5,)),
+    ('pattern_type', np.float32),
+    ('blend_factor', np.float32),
+])
+
+_COLUMNS = ('r', 's', 'k', 'pattern_type', 'blend_factor')
+
+
+class CellDiskCache:
+    """
+    Size-capped directory of per-block tile files. Not thread-safe: used
+    from the TileDataManager worker thread only.
+    """
+
+    def __init__(self, directory, budget_bytes):
+        self.logger = logging.getLogger('CellDiskCache')
+        self.root = os.path.join(os.path.expanduser(directory), f"v{FORMAT_VERSION}")
+        self.budget = budget_bytes
+        self._index = None   # path -> [mtime, size], scanned on first use
+        self._bytes = 0
+
+    @staticmethod
+    def block_of(cx, cy):
+        return cx // BLOCK, cy // BLOCK
+
+    def _path(self, gamma_key, cell_size, block):
+        digest = hashlib.sha1(repr((gamma_key, float(cell_size))).encode()).hexdigest()[:16]
+        return os.path.join(self.root, digest, f"{block[0]}_{block[1]}.npy")
+
+    def _scan(self):
+        """Index existing files of the current format version."""
+        self._index = {}
+        self._bytes = 0
+        if os.path.isdir(self.root):
+            for entry in os.scandir(self.root):
+                if not entry.is_dir():
+                    continue
+                for f in os.scandir(entry.path):
+                    if f.name.endswith('.npy'):
+                        st = f.stat()
+                        self._index[f.path] = [st.st_mtime, st.st_size]
+                        self._bytes += st.st_size
+        self._evict()
+
+    def _read(self, path):
+        """Records of one block file, or None if missing or stale."""
+        if path not in self._index:
+            return None
+        try:
+            records = np.load(path, mmap_mode='r', allow_pickle=False)
+            if records.dtype != _RECORD or records.ndim != 1:
+                self._drop(path)
+                return None
+            records = np.array(records)
+            os.utime(path)
+            self._index[path][0] = os.path.getmtime(path)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable cell file {path}: {e}")
+            self._drop(path)
+            return None
+        return records
+
+    def load_block(self, gamma_key, cell_size, cx, cy):
+        """All cells stored for the block containing (cx, cy):
+        {(cx, cy): (r, s, k, pattern_type, blend_factor)}."""
+        if self._index is None:
+            self._scan()
+        block = self.block_of(cx, cy)
+        records = self._read(self._path(gamma_key, cell_size, block))
+        if records is None:
+            return {}
+        cells = {}
+        order = np.argsort(records['cell'], kind='stable')
+        records = records[order]
+        ids, starts = np.unique(records['cell'], return_index=True)
+        ends = np.append(starts[1:], len(records))
+        for cell, lo, hi in zip(ids.tolist(), starts.tolist(), ends.tolist()):
+            part = records[lo:hi]
+            part = part[part['r'] >= 0]
+            key = (block[0] * BLOCK + cell % BLOCK, block[1] * BLOCK + cell // BLOCK)
+            cells[key] = tuple(np.ascontiguousarray(part[name]) for name in _COLUMNS)
+        return cells
+
+    def save_cells(self, gamma_key, cell_size, cells):
+        """Write cells {(cx, cy): (r, s, k, pattern_type, blend_factor)},
+        merged into their block files, then evict past the budget."""
+        if self._index is None:
+            self._scan()
+        blocks = {}
+        for (cx, cy), cols in cells.items():
+            blocks.setdefault(self.block_of(cx, cy), {})[(cx, cy)] = cols
+
+        for block, block_cells in blocks.items():
+            path = self._path(gamma_key, cell_size, block)
+            parts = []
+            local = {(cx % BLOCK) + (cy % BLOCK) * BLOCK: cols
+                     for (cx, cy), cols in block_cells.items()}
+            existing = self._read(path)
+            if existing is not None:
+                parts.append(existing[~np.isin(existing['cell'], list(local))])
+            for cell, cols in local.items():
+                n = len(cols[0])
+                part = np.zeros(max(n, 1), dtype=_RECORD)
+                part['cell'] = cell
+                if n:
+                    for name, col in zip(_COLUMNS, cols):
+                        part[name] = col
+                else:
+                    part['r'] = -1
+                parts.append(part)
+            self._write(path, np.concatenate(parts))
+        self._evict()
+
+    def _write(self, path, records):
+        tmp = path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, 'wb') as f:
+                np.save(f, records, allow_pickle=False)
+            os.replace(tmp, path)
+            st = os.stat(path)
+        except OSError as e:
+            self.logger.warning(f"Cell cache write failed ({path}): {e}")
+            return
+        old = self._index.get(path)
+        if old is not None:
+            self._bytes -= old[1]
+        self._index[path] = [st.st_mtime, st.st_size]
+        self._bytes += st.st_size
+
+    def _evict(self):
+        if self._bytes <= self.budget:
+            return
+        for path, _ in sorted(self._index.items(), key=lambda item: item[1][0]):
+            if self._bytes <= self.budget:
+                break
+            self._drop(path)
+
+    def _drop(self, path):
+        entry = self._index.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -57,6 +57,8 @@ class DemoController:
         self.pan_direction_timer = 0.0
         self.pan_direction_interval = 8.0  # seconds between direction changes
         self.pan_speed = 0.02
+        # Let the renderer project the pan schedule for overlay prefetch
+        renderer.pan_planner = self
 
         # Action scheduling
         self.action_timer = 0.0
@@ -118,6 +120,15 @@ class DemoController:
         dy = math.sin(self.pan_angle)
         self.renderer.move_direction(dx, dy, speed=self.pan_speed)
 
+    def heading_at(self, t):
+        """Pan heading (dx, dy, speed) applied t seconds from now, or None
+        while the demo isn't panning."""
+        if not self.active or self.paused:
+            return None
+        turns = int((self.pan_direction_timer + t) // self.pan_direction_interval)
+        angle = self.pan_angle + turns * GOLDEN_ANGLE
+        return math.cos(angle), math.sin(angle), self.pan_speed
+
     def _schedule_next_action(self):
         """Advance to the next action in the cycle."""
         self.action_index = (self.action_index + 1) % len(ACTION_CYCLE)
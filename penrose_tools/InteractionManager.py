@@ -17,7 +17,7 @@ class InteractionManager:
     Delegates GPU data updates to TileDataManager.
 
     Performance notes:
-    - Tile index lookups are O(1) via TileDataManager._tile_index_map
+    - Neighbor lookups return tile indices directly from the TileStore
     - Dirty tile indices are tracked for partial GPU uploads (not full re-uploads)
     - Animation list uses index-based removal to avoid O(N) list.remove()
     """
@@ -91,16 +91,14 @@ class InteractionManager:
     # Dirty tracking for partial GPU uploads
     # -------------------------------------------------------------------------
 
-    def get_dirty_range(self):
-        """Return (min_index, count) of dirty tiles for partial GPU upload.
-        Clears the dirty set. Returns (0, 0) if nothing changed."""
+    def get_dirty_indices(self):
+        """Return the sorted dirty tile indices for partial GPU upload.
+        Clears the dirty set. Returns an empty list if nothing changed."""
         if not self._dirty_indices:
-            return 0, 0
-        lo = min(self._dirty_indices)
-        hi = max(self._dirty_indices)
-        count = hi - lo + 1
+            return []
+        indices = sorted(self._dirty_indices)
         self._dirty_indices.clear()
-        return lo, count
+        return indices
 
     def _mark_dirty(self, tile_index):
         """Mark a tile index as needing GPU upload."""
@@ -187,11 +185,8 @@ class InteractionManager:
         for depth in range(1, self.cascade_depth + 1):
             next_ring = []
             for idx in current_ring:
-                tile = self.tile_manager.tile_list[idx]
-                for neighbor in tile.neighbors:
-                    # O(1) lookup via identity map
-                    n_idx = self.tile_manager.get_tile_index(neighbor)
-                    if n_idx >= 0 and n_idx not in visited:
+                for n_idx in self.tile_manager.get_neighbors(idx):
+                    if n_idx not in visited:
                         visited.add(n_idx)
                         next_ring.append(n_idx)
 
@@ -216,10 +211,8 @@ class InteractionManager:
         for depth in range(1, self.cascade_depth + 2):
             next_ring = []
             for idx in current_ring:
-                tile = self.tile_manager.tile_list[idx]
-                for neighbor in tile.neighbors:
-                    n_idx = self.tile_manager.get_tile_index(neighbor)
-                    if n_idx >= 0 and n_idx not in visited:
+                for n_idx in self.tile_manager.get_neighbors(idx):
+                    if n_idx not in visited:
                         visited.add(n_idx)
                         next_ring.append(n_idx)
 
@@ -251,8 +244,8 @@ class InteractionManager:
         origin_tiles = self._expand_pattern_origin(center_index)
 
         # Compute origin centroid (center of symmetry analysis)
-        tile_list = self.tile_manager.tile_list
-        origin_centroids = [tile_list[i].centroid for i in origin_tiles]
+        store = self.tile_manager.store
+        origin_centroids = [store.centroid(i) for i in origin_tiles]
         origin_center = sum(origin_centroids) / len(origin_centroids)
 
         visited = set(origin_tiles)
@@ -268,10 +261,8 @@ class InteractionManager:
         for depth in range(1, self.cascade_depth + 2):
             next_ring = []
             for idx in current_ring:
-                tile = tile_list[idx]
-                for neighbor in tile.neighbors:
-                    n_idx = self.tile_manager.get_tile_index(neighbor)
-                    if n_idx >= 0 and n_idx not in visited:
+                for n_idx in self.tile_manager.get_neighbors(idx):
+                    if n_idx not in visited:
                         visited.add(n_idx)
                         next_ring.append(n_idx)
 
@@ -282,7 +273,7 @@ class InteractionManager:
 
             # Analyze this ring for 5-fold symmetry
             symmetric_indices = self._check_ring_symmetry(
-                next_ring, origin_center, tile_list)
+                next_ring, origin_center, store)
 
             for idx in next_ring:
                 self._add_animation(idx, self.ANIM_RIPPLE,
@@ -293,7 +284,7 @@ class InteractionManager:
 
             current_ring = next_ring
 
-    def _check_ring_symmetry(self, ring_indices, center, tile_list):
+    def _check_ring_symmetry(self, ring_indices, center, store):
         """Analyze a ring of tiles for 5-fold rotational symmetry.
 
         Divides tiles into 5 angular sectors (72° each) around the center.
@@ -313,14 +304,13 @@ class InteractionManager:
         # Compute angle and type for each tile in the ring
         tile_angles = []
         for idx in ring_indices:
-            tile = tile_list[idx]
-            c = tile.centroid
+            c = store.centroid(idx)
             dx = c.real - center.real
             dy = c.imag - center.imag
             angle = math.atan2(dy, dx)  # -π to π
             if angle < 0:
                 angle += 2.0 * math.pi  # normalize to 0..2π
-            tile_angles.append((idx, angle, tile.is_kite))
+            tile_angles.append((idx, angle, bool(store.is_kite[idx])))
 
         # Try 36 rotation offsets (every 10°) to find best sector alignment
         best_offset = 0.0
@@ -360,8 +350,8 @@ class InteractionManager:
         """If the tile at center_index is part of a star/starburst pattern,
         return all tile indices in that connected pattern group.
         Otherwise return just {center_index}."""
-        tile = self.tile_manager.tile_list[center_index]
-        pt = tile.pattern_type
+        pattern_type = self.tile_manager.store.pattern_type
+        pt = pattern_type[center_index]
         if pt < 0.5:
             # Normal tile — single origin
             return {center_index}
@@ -372,11 +362,9 @@ class InteractionManager:
         while frontier:
             next_frontier = []
             for idx in frontier:
-                t = self.tile_manager.tile_list[idx]
-                for nb in t.neighbors:
-                    n_idx = self.tile_manager.get_tile_index(nb)
-                    if n_idx >= 0 and n_idx not in group:
-                        if nb.pattern_type == pt:
+                for n_idx in self.tile_manager.get_neighbors(idx):
+                    if n_idx not in group:
+                        if pattern_type[n_idx] == pt:
                             group.add(n_idx)
                             next_frontier.append(n_idx)
             frontier = next_frontier
@@ -475,11 +463,33 @@ class InteractionManager:
         self._mask_stamp_active = False
         self.clear_hover()
 
-    def on_tiles_regenerated(self):
+    def on_tiles_regenerated(self, row_remap=None):
         """Called when TileDataManager swaps in a new tile set.
-        Old tile indices are invalid — clear all state without writing back."""
-        self._hovered_index = -1
-        self._selected_indices.clear()
-        self._animations.clear()
+
+        row_remap maps old tile indices to new ones (-1 for tiles that left
+        the generation zone); hover, selection, animations and symmetry tiles
+        follow their tiles. TileDataManager has already carried the matching
+        GPU columns over. Without a remap (gamma changed) old indices are
+        invalid — clear all state without writing back."""
         self._dirty_indices.clear()
-        self._symmetry_tile_indices.clear()
+        if row_remap is None:
+            self._hovered_index = -1
+            self._selected_indices.clear()
+            self._animations.clear()
+            self._symmetry_tile_indices.clear()
+            return
+
+        def remap(index):
+            return int(row_remap[index]) if 0 <= index < len(row_remap) else -1
+
+        self._hovered_index = remap(self._hovered_index)
+        self._selected_indices = {j for j in map(remap, self._selected_indices) if j >= 0}
+        self._symmetry_tile_indices = {
+            j for j in map(remap, self._symmetry_tile_indices) if j >= 0}
+        animations = []
+        for anim in self._animations:
+            index = remap(anim['tile_index'])
+            if index >= 0:
+                anim['tile_index'] = index
+                animations.append(anim)
+        self._animations = animations
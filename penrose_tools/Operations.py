@@ -1,9 +1,29 @@
 import cmath
 import configparser
+import math
 from penrose_tools.Tile import Tile
 
 class Operations:
 
+    # Optional overlay tuning keys in [Settings]: key -> parser.
+    # Only keys present in the file are returned by read_config_file.
+    OVERLAY_SETTINGS = {
+        'overlay_blend_passes': int,
+        'overlay_blend_self_weight': float,
+        'overlay_cell_size': float,
+        'overlay_cell_cache_mb': float,
+        'overlay_tileset_cache_mb': float,
+        'overlay_disk_cache_dir': str,
+        'overlay_disk_cache_mb': float,
+        'overlay_process_workers': int,
+        'overlay_progressive_chunks': int,
+        'overlay_max_tiles': int,
+        'overlay_zoom_bucket_ratio': float,
+        'overlay_analytic_patterns': lambda v: v.strip().lower() in ('1', 'true', 'yes', 'on'),
+    }
+
+    # Vertices within this distance are the same vertex (star/starburst search)
+    VERTEX_TOLERANCE = 1e-3
 
     def __init__(self):
         # Fifth roots of unity.
@@ -38,7 +58,17 @@ class Operations:
             settings['vertex_offset'] = float(self.config.get('Settings', 'vertex_offset'))
         except (configparser.NoOptionError, ValueError):
             settings['vertex_offset'] = 0.00009  # Default value if not present or invalid
-        
+
+        # Overlay tuning keys are optional; invalid values are ignored
+        for key, parse in self.OVERLAY_SETTINGS.items():
+            value = self.config.get('Settings', key, fallback=None)
+            if value is None:
+                continue
+            try:
+                settings[key] = parse(value)
+            except ValueError:
+                pass
+
         return settings
 
     def parse_color(self, color_string):
@@ -171,13 +201,8 @@ class Operations:
                         # Check if any vertex is within the screen bounds
                         if any(0 <= x <= width and 0 <= y <= height for x, y in screen_vertices):
                             color = (0, 255, 255) if (r-s)**2 % 5 == 1 else (0, 255, 0)
-                            tile = Tile(vertices, color)
-                            # Store pentagrid parameters for matching with procedural shader
-                            tile.r = r
-                            tile.s = s
-                            tile.kr = kr
-                            tile.ks = ks
-                            tiles.append(tile)
+                            # Pentagrid parameters for matching with procedural shader
+                            tiles.append(Tile(vertices, color, r, s, kr, ks))
 
         return tiles
 
@@ -213,8 +238,32 @@ class Operations:
         """Clamp vertices to a specified precision."""
         return [complex(round(v.real, precision), round(v.imag, precision)) for v in vertices]
     
-    def find_star(self, tile, tiles):
-        """Find if the tile is part of a star (5 kites with a common vertex)."""
+    def vertex_index(self, tiles):
+        """Index a tile set by vertex: grid cell (2 * VERTEX_TOLERANCE wide)
+        -> positions in tiles of the tiles with a vertex in that cell.
+        Build once per tile set and pass to find_star / find_starburst."""
+        cell = 2 * self.VERTEX_TOLERANCE
+        index = {}
+        for i, tile in enumerate(tiles):
+            for v in tile.vertices:
+                index.setdefault((math.floor(v.real / cell), math.floor(v.imag / cell)), []).append(i)
+        return index
+
+    def tiles_at_vertex(self, vertex, tiles, index):
+        """Tiles with a vertex within VERTEX_TOLERANCE of vertex, in tiles order."""
+        cell = 2 * self.VERTEX_TOLERANCE
+        cx = math.floor(vertex.real / cell)
+        cy = math.floor(vertex.imag / cell)
+        found = set()
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                found.update(index.get((cx + dx, cy + dy), ()))
+        return [tiles[i] for i in sorted(found)
+                if any(cmath.isclose(v, vertex, abs_tol=self.VERTEX_TOLERANCE) for v in tiles[i].vertices)]
+
+    def find_star(self, tile, tiles, index=None):
+        """Find if the tile is part of a star (5 kites with a common vertex).
+        index is the vertex_index of tiles (built here if not given)."""
         kite_neighbors = [neighbor for neighbor in tile.neighbors if neighbor.is_kite and self.is_valid_star_kite(neighbor)]
         for n1 in kite_neighbors:
             for n2 in kite_neighbors:
@@ -222,19 +271,26 @@ class Operations:
                     possible_star = [tile, n1, n2]
                     common_vertex = self.find_common_vertex(possible_star)
                     if common_vertex:
-                        extended_star = [t for t in tiles if any(cmath.isclose(v, common_vertex, abs_tol=1e-3) for v in t.vertices) and t.is_kite and self.is_valid_star_kite(t)]
+                        if index is None:
+                            index = self.vertex_index(tiles)
+                        extended_star = [t for t in self.tiles_at_vertex(common_vertex, tiles, index)
+                                         if t.is_kite and self.is_valid_star_kite(t)]
                         if len(extended_star) == 5:
                             return extended_star
         return []
 
-    def find_starburst(self, tile, tiles):
-        """Find if the tile is part of a starburst (10 darts with a common vertex)."""
+    def find_starburst(self, tile, tiles, index=None):
+        """Find if the tile is part of a starburst (10 darts with a common vertex).
+        index is the vertex_index of tiles (built here if not given)."""
         dart_neighbors = [neighbor for neighbor in tile.neighbors if not neighbor.is_kite and self.is_valid_starburst_dart(neighbor)]
         potential_starburst = [tile] + dart_neighbors
         if len(potential_starburst) >= 3:
             common_vertex = self.find_common_vertex(potential_starburst)
             if common_vertex:
-                extended_starburst = [t for t in tiles if any(cmath.isclose(v, common_vertex, abs_tol=1e-3) for v in t.vertices) and not t.is_kite and self.is_valid_starburst_dart(t)]
+                if index is None:
+                    index = self.vertex_index(tiles)
+                extended_starburst = [t for t in self.tiles_at_vertex(common_vertex, tiles, index)
+                                      if not t.is_kite and self.is_valid_starburst_dart(t)]
                 if len(extended_starburst) == 10:
                     return extended_starburst
         return []
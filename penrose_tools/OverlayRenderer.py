@@ -31,6 +31,19 @@ class OverlayRenderer:
         self.tile_count = 0
         self._vbo_capacity = 0  # allocated VBO capacity in tiles
 
+        # Stable slot allocation: tiles keep their instance slot across
+        # regenerations, so only new tiles are written to the VBOs.
+        # CPU mirrors of both VBOs (slot order) let partial uploads and
+        # capacity growth work without reading back from the GPU.
+        self._live_keys = np.zeros(0, dtype=np.int64)    # sorted keys on GPU
+        self._live_slots = np.zeros(0, dtype=np.int64)   # slot of each live key
+        self._free_slots = np.zeros(0, dtype=np.int64)   # sorted free slots
+        self._slot_count = 0                             # high-water mark
+        self._row_slots = np.zeros(0, dtype=np.int64)    # tile row -> slot
+        self._vert_mirror = np.zeros((0, 8), dtype=np.float32)
+        self._data_mirror = np.zeros((0, 8), dtype=np.float32)
+        self.last_upload_tiles = 0   # slots written by the last upload_tiles
+
         # Depth mask texture
         self.mask_texture = None
         self.mask_enabled = False
@@ -227,44 +240,204 @@ class OverlayRenderer:
         self._vbo_capacity = new_capacity
         self.logger.debug(f"VBO capacity allocated: {new_capacity} tiles")
 
-    def upload_tile_chunk(self, gpu_vertices, gpu_tile_data, offset, count):
-        """Upload a chunk of tiles using glBufferSubData (both VBOs).
-        Does NOT change self.tile_count -- caller manages renderable count.
-        """
-        if count == 0:
-            return
+    def set_renderable_count(self, count):
+        """Set how many tiles (instance slots) to draw. Progressive chunks
+        extend the slot high-water mark, revealing tiles as they arrive."""
+        self.tile_count = count
 
-        byte_offset = offset * 8 * 4  # 8 floats * 4 bytes per tile
+    # -------------------------------------------------------------------------
+    # Stable slot allocation
+    # -------------------------------------------------------------------------
 
-        vert_slice = gpu_vertices[offset:offset + count].reshape(-1).astype(np.float32)
-        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vert_vbo)
-        glBufferSubData(GL_ARRAY_BUFFER, byte_offset, vert_slice.nbytes, vert_slice)
+    def reset_slots(self):
+        """Forget all slot assignments (e.g. after a gamma change, when the
+        same key no longer means the same geometry)."""
+        self._live_keys = np.zeros(0, dtype=np.int64)
+        self._live_slots = np.zeros(0, dtype=np.int64)
+        self._free_slots = np.zeros(0, dtype=np.int64)
+        self._slot_count = 0
+        self._row_slots = np.zeros(0, dtype=np.int64)
+        self._vert_mirror[:] = 0.0
+        self._data_mirror[:] = 0.0
+        self.tile_count = 0
 
-        data_slice = gpu_tile_data[offset:offset + count].reshape(-1).astype(np.float32)
-        glBindBuffer(GL_ARRAY_BUFFER, self.instance_data_vbo)
-        glBufferSubData(GL_ARRAY_BUFFER, byte_offset, data_slice.nbytes, data_slice)
+    def assign_slots(self, keys):
+        """Map a tile set's keys to stable instance slots.
 
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        Keys already on the GPU keep their slot; slots of keys that are gone
+        go to the free list, and new keys take the lowest free slots before
+        the high-water mark grows. When the high-water mark reaches twice
+        the live count the allocator starts over (compaction).
 
-    def upload_pattern_patch_chunk(self, gpu_tile_data, offset, count):
-        """Upload pattern data (columns 1,2) for a range of tiles.
-        Uploads the full 8-float row for each tile in the range so that
-        interaction state in other columns is preserved.
+        Returns (slots, is_new, stale): slot per row, mask of rows that must
+        be written, and retired slots that were not reused.
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        n = len(keys)
+        if self._slot_count > 2 * n + 1024:
+            self.reset_slots()
+
+        live = self._live_keys
+        if len(live):
+            pos = np.minimum(np.searchsorted(live, keys), len(live) - 1)
+            found = live[pos] == keys
+        else:
+            pos = np.zeros(n, dtype=np.int64)
+            found = np.zeros(n, dtype=bool)
+
+        slots = np.full(n, -1, dtype=np.int64)
+        slots[found] = self._live_slots[pos[found]]
+
+        kept = np.zeros(len(live), dtype=bool)
+        kept[pos[found]] = True
+        retired = self._live_slots[~kept]
+        free = np.union1d(self._free_slots, retired)
+
+        is_new = ~found
+        self._free_slots = free
+        slots[is_new] = self._take_slots(int(np.count_nonzero(is_new)))
+        stale = np.intersect1d(self._free_slots, retired, assume_unique=True)
+
+        order = np.argsort(keys, kind='stable')
+        self._live_keys = keys[order]
+        self._live_slots = slots[order]
+        self._row_slots = slots
+        return slots, is_new, stale
+
+    def _take_slots(self, count):
+        """Pop the lowest count free slots, growing the high-water mark for
+        the remainder."""
+        reuse = self._free_slots[:count]
+        grow = count - len(reuse)
+        self._free_slots = self._free_slots[len(reuse):]
+        taken = np.concatenate([
+            reuse, np.arange(self._slot_count, self._slot_count + grow, dtype=np.int64)])
+        self._slot_count += grow
+        return taken
+
+    def upload_tiles(self, gpu_vertices, gpu_tile_data, keys):
+        """Upload a tile set through the slot allocator.
+
+        Only rows with new keys are written; retired slots that were not
+        reused are zeroed (degenerate quads draw nothing). Bus traffic
+        scales with the tiles that changed, not the tile count.
+        """
+        slots, is_new, stale = self.assign_slots(keys)
+        grew = self._ensure_slot_capacity(self._slot_count)
+
+        rows = np.flatnonzero(is_new)
+        new_slots = slots[rows]
+        self._vert_mirror[new_slots] = gpu_vertices[rows].reshape(-1, 8)
+        self._data_mirror[new_slots] = gpu_tile_data[rows]
+        self._vert_mirror[stale] = 0.0
+        self._data_mirror[stale] = 0.0
+
+        if grew:
+            # Storage was reallocated: re-upload everything below the mark
+            self._upload_slot_range(0, self._slot_count, vertices=True)
+            written = self._slot_count
+        else:
+            changed = np.concatenate([new_slots, stale])
+            self._upload_slots(changed, vertices=True)
+            written = len(changed)
+
+        self.last_upload_tiles = written
+        self.set_renderable_count(self._slot_count)
+        self.logger.debug(f"Slot upload: {written} of {len(slots)} tiles written "
+                          f"(mark {self._slot_count}, free {len(self._free_slots)})")
+        return slots
+
+    def add_tiles(self, gpu_vertices, gpu_tile_data, keys):
+        """Upload one progressive chunk of a tile set that is still being
+        generated. Keys already on the GPU are left alone and nothing is
+        retired (the complete set, passed to upload_tiles later, does that).
+        The new tiles become visible immediately.
         """
-        if count == 0:
+        keys = np.asarray(keys, dtype=np.int64)
+        live = self._live_keys
+        if len(live):
+            pos = np.minimum(np.searchsorted(live, keys), len(live) - 1)
+            rows = np.flatnonzero(live[pos] != keys)
+        else:
+            rows = np.arange(len(keys))
+        if len(rows) == 0:
             return
 
-        byte_offset = offset * 8 * 4
-        data_slice = gpu_tile_data[offset:offset + count].reshape(-1).astype(np.float32)
+        new_slots = self._take_slots(len(rows))
+        grew = self._ensure_slot_capacity(self._slot_count)
+        self._vert_mirror[new_slots] = gpu_vertices[rows].reshape(-1, 8)
+        self._data_mirror[new_slots] = gpu_tile_data[rows]
+        if grew:
+            self._upload_slot_range(0, self._slot_count, vertices=True)
+        else:
+            self._upload_slots(new_slots, vertices=True)
+
+        merged_keys = np.concatenate([live, keys[rows]])
+        merged_slots = np.concatenate([self._live_slots, new_slots])
+        order = np.argsort(merged_keys, kind='stable')
+        self._live_keys = merged_keys[order]
+        self._live_slots = merged_slots[order]
+        self.set_renderable_count(self._slot_count)
+
+    def update_tile_rows(self, gpu_tile_data, rows=None):
+        """Sync per-tile data rows (pattern or interaction changes) to their
+        slots. Only rows whose data differs from what is on the GPU are sent.
+        """
+        if rows is None:
+            rows = np.arange(min(len(gpu_tile_data), len(self._row_slots)))
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            rows = rows[(rows >= 0) & (rows < len(self._row_slots))]
+        if len(rows) == 0:
+            return
+        slots = self._row_slots[rows]
+        new_data = gpu_tile_data[rows]
+        changed = np.any(self._data_mirror[slots] != new_data, axis=1)
+        if not changed.any():
+            return
+        self._data_mirror[slots[changed]] = new_data[changed]
+        self._upload_slots(slots[changed], vertices=False)
+
+    def _ensure_slot_capacity(self, count):
+        """Grow VBOs and mirrors to hold count slots. Returns True if the GPU
+        storage was reallocated (its contents are then undefined)."""
+        if count > len(self._vert_mirror):
+            new_len = ((count // 1000) + 1) * 1000
+            for name in ('_vert_mirror', '_data_mirror'):
+                old = getattr(self, name)
+                grown = np.zeros((new_len, 8), dtype=np.float32)
+                grown[:len(old)] = old
+                setattr(self, name, grown)
+        if count <= self._vbo_capacity:
+            return False
+        self.ensure_capacity(count)
+        return True
+
+    def _upload_slots(self, slots, vertices, max_gap=32):
+        """Upload mirror rows for the given slots, merged into runs. Slots
+        closer than max_gap share one glBufferSubData call."""
+        if len(slots) == 0:
+            return
+        slots = np.unique(slots)
+        breaks = np.flatnonzero(np.diff(slots) > max_gap)
+        starts = np.concatenate([[slots[0]], slots[breaks + 1]])
+        ends = np.concatenate([slots[breaks], [slots[-1]]])
+        for lo, hi in zip(starts.tolist(), ends.tolist()):
+            self._upload_slot_range(lo, hi + 1, vertices)
+
+    def _upload_slot_range(self, start, stop, vertices):
+        if stop <= start:
+            return
+        byte_offset = start * 8 * 4
+        if vertices:
+            vert_slice = self._vert_mirror[start:stop]
+            glBindBuffer(GL_ARRAY_BUFFER, self.instance_vert_vbo)
+            glBufferSubData(GL_ARRAY_BUFFER, byte_offset, vert_slice.nbytes, vert_slice)
+        data_slice = self._data_mirror[start:stop]
         glBindBuffer(GL_ARRAY_BUFFER, self.instance_data_vbo)
         glBufferSubData(GL_ARRAY_BUFFER, byte_offset, data_slice.nbytes, data_slice)
         glBindBuffer(GL_ARRAY_BUFFER, 0)
 
-    def set_renderable_count(self, count):
-        """Set how many tiles to draw. Used during chunked upload to
-        progressively reveal tiles as they are uploaded."""
-        self.tile_count = count
-
     def upload_mask_texture(self, mask_data, width, height):
         """Upload a depth mask as a GPU texture.
         mask_data: numpy array of shape (height, width) with float32 values in [0, 1].
@@ -301,16 +474,6 @@ class OverlayRenderer:
         """Clear the mask center override — use camera position instead."""
         self.mask_center = None
 
-    def upload_tile_data_partial(self, gpu_tile_data, offset, count):
-        """Partial update of tile data (interaction changes only)."""
-        if count == 0:
-            return
-        data_slice = gpu_tile_data[offset:offset + count].reshape(-1).astype(np.float32)
-        byte_offset = offset * 8 * 4  # 8 floats × 4 bytes per tile
-        glBindBuffer(GL_ARRAY_BUFFER, self.instance_data_vbo)
-        glBufferSubData(GL_ARRAY_BUFFER, byte_offset, data_slice.nbytes, data_slice)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-
     # -------------------------------------------------------------------------
     # Rendering
     # -------------------------------------------------------------------------
@@ -0,0 +1,102 @@
+# penrose_tools/PatternHash.py
+"""
+Open-addressed hash table of tile patterns for the procedural region_blend
+shader (the texture fallback used when the overlay is unavailable).
+- Keys are lattice ids (r, s, kr, ks), so the shader looks up the tile
+  findTile() returns directly; per-pixel cost doesn't depend on tile count
+- One RGBA32F texel per slot: (kr, ks, (r*5 + s + 1) + 32 * pattern_type,
+  blend_factor); a slot with B == 0 is empty
+- Linear probing from hash_keys() at load factor <= 0.5; the table reports
+  its longest probe run, which bounds the shader's loop
+- The table is at most TABLE_WIDTH texels wide (power of two) with as many
+  rows as needed, so it stays inside GL_MAX_TEXTURE_SIZE
+- probe() is the Python reference of lookupPattern() in pentagrid_common.glsl
+"""
+import numpy as np
+
+TABLE_WIDTH = 1024     # max texels per row (GL 3 guarantees 1024)
+MIN_CAPACITY = 64
+KEY_OFFSET = 32768     # keeps kr, ks non-negative before the uint cast
+CODE_STRIDE = 32.0     # B = rs code + CODE_STRIDE * pattern_type
+
+
+def hash_keys(r, s, kr, ks):
+    """uint32 hash of lattice keys; must match patternHash() in GLSL."""
+    with np.errstate(over='ignore'):
+        h = ((np.asarray(kr, dtype=np.int64) + KEY_OFFSET).astype(np.uint32) * np.uint32(73856093)) \
+            ^ ((np.asarray(ks, dtype=np.int64) + KEY_OFFSET).astype(np.uint32) * np.uint32(19349663)) \
+            ^ ((np.asarray(r, dtype=np.int64) * 5 + s).astype(np.uint32) * np.uint32(83492791))
+        h ^= h >> np.uint32(16)
+        h *= np.uint32(0x7feb352d)
+        h ^= h >> np.uint32(15)
+    return h
+
+
+def pack_patterns(r, s, kr, ks, pattern_type, blend_factor):
+    """
+    Build the table for the given tiles (1D arrays, one entry per tile;
+    later duplicates of a key are ignored).
+    Returns (texture float32 (height, width, 4), max_probe).
+    """
+    r = np.asarray(r, dtype=np.int64)
+    s = np.asarray(s, dtype=np.int64)
+    kr = np.asarray(kr, dtype=np.int64)
+    ks = np.asarray(ks, dtype=np.int64)
+    codes = r * 5 + s + 1
+
+    stacked = np.stack([codes, kr, ks], axis=1)
+    _, first = np.unique(stacked, axis=0, return_index=True)
+    first.sort()
+    n = len(first)
+
+    capacity = MIN_CAPACITY
+    while capacity < 2 * n:
+        capacity *= 2
+    width = min(capacity, TABLE_WIDTH)
+    table = np.zeros((capacity, 4), dtype=np.float32)
+
+    # Parallel linear probing: in round d every unplaced key tries slot
+    # home + d; the first contender for an empty slot takes it. A key placed
+    # in round d found slots home..home+d-1 occupied, as a lookup will.
+    mask = capacity - 1
+    home = hash_keys(r[first], s[first], kr[first], ks[first]).astype(np.int64) & mask
+    pending = np.arange(n)
+    occupied = np.zeros(capacity, dtype=bool)
+    max_probe = 0
+    d = 0
+    while len(pending):
+        slots = (home[pending] + d) & mask
+        free = ~occupied[slots]
+        _, winner = np.unique(np.where(free, slots, -1), return_index=True)
+        winner = winner[free[winner]]
+        placed = pending[winner]
+        rows = first[placed]
+        table[slots[winner]] = np.stack([
+            kr[rows], ks[rows],
+            codes[rows] + CODE_STRIDE * np.asarray(pattern_type, dtype=np.float64)[rows],
+            np.asarray(blend_factor, dtype=np.float64)[rows],
+        ], axis=1)
+        occupied[slots[winner]] = True
+        if len(placed):
+            max_probe = d + 1
+        pending = np.delete(pending, winner)
+        d += 1
+
+    return table.reshape(capacity // width, width, 4), max_probe
+
+
+def probe(table, max_probe, r, s, kr, ks):
+    """Reference lookup: (pattern_type, blend_factor) for one key, or None."""
+    height, width = table.shape[:2]
+    flat = table.reshape(-1, 4)
+    mask = height * width - 1
+    slot = int(hash_keys(r, s, kr, ks)) & mask
+    code = r * 5 + s + 1
+    for _ in range(max_probe):
+        texel = flat[slot]
+        if texel[2] == 0.0:
+            return None
+        if texel[0] == kr and texel[1] == ks and texel[2] % CODE_STRIDE == code:
+            return float(texel[2] // CODE_STRIDE), float(texel[3])
+        slot = (slot + 1) & mask
+    return None
@@ -10,10 +10,14 @@ import glfw
 import logging
 import os
 import re
+import threading
 from penrose_tools.Operations import Operations
+from penrose_tools.Tile import Tile
 from penrose_tools.TileDataManager import TileDataManager
 from penrose_tools.OverlayRenderer import OverlayRenderer
 from penrose_tools.InteractionManager import InteractionManager
+from penrose_tools.PatternHash import pack_patterns
+from penrose_tools.TileStore import generate_tiles
 
 
 class ProceduralRenderer:
@@ -57,6 +61,12 @@ class ProceduralRenderer:
         self.velocity_y = 0.0
         self.velocity_decay = 0.92  # How quickly velocity decays
 
+        # Path prediction for overlay prefetch; the demo registers its pan schedule
+        self.pan_planner = None
+        self.prefetch_horizon = 1.5     # seconds of camera path to prefetch
+        self.prefetch_interval = 0.25   # seconds between prefetch requests
+        self._last_prefetch_time = 0.0
+
         # Time tracking for frame-independent smoothing
         self.last_update_time = glfw.get_time()
         self._last_render_time = glfw.get_time()
@@ -82,7 +92,18 @@ class ProceduralRenderer:
         # Pattern cache for region_blend effect
         self.pattern_cache = {}
         self.pattern_texture = None
+        self._pattern_max_probe = 0      # longest probe run of the uploaded pattern table
         self.last_pattern_params = None  # (camera_x, camera_y, zoom, width, height, gamma)
+        # Background worker for the fallback: render() posts the latest
+        # request and uploads finished arrays, keeping the previous texture
+        # until then
+        self._pattern_cond = threading.Condition()
+        self._pattern_request = None     # (params, width, height, gamma, camera_x, camera_y, zoom)
+        self._pattern_result = None      # (params, patterns, packed pattern table)
+        self._pattern_requested_params = None
+        self._pattern_failed_params = None   # not re-posted until the viewport changes
+        self._pattern_thread = None
+        self._pattern_shutdown = False
 
         # Overlay system — always-on for interaction support across all effects
         self.tile_manager = None
@@ -93,6 +114,7 @@ class ProceduralRenderer:
 
         # Generation tracking for two-pass pipeline
         self._chunk_gen_id = 0           # generation ID to match geometry with patterns
+        self._slot_reset_gen_id = 0      # generation whose chunks last reset the VBO slots
 
         # Effects that use the overlay for their primary rendering (opaque overlay)
         self.OVERLAY_EFFECTS = {'region_blend'}
@@ -219,6 +241,7 @@ class ProceduralRenderer:
             'u_edge_thickness': glGetUniformLocation(program, 'u_edge_thickness'),
             'u_gamma': glGetUniformLocation(program, 'u_gamma'),
             'u_pattern_texture': glGetUniformLocation(program, 'u_pattern_texture'),
+            'u_pattern_max_probe': glGetUniformLocation(program, 'u_pattern_max_probe'),
             # Depth camera uniforms (used by eye_spy effect)
             'u_depth_texture': glGetUniformLocation(program, 'u_depth_texture'),
             'u_depth_enabled': glGetUniformLocation(program, 'u_depth_enabled'),
@@ -395,10 +418,12 @@ void main() {
             self.render_scale = 1.0
 
     def _use_overlay(self):
-        """Check if current effect should use the overlay as its primary rendering path."""
+        """Check if current effect should use the overlay as its primary rendering path.
+        Past the overlay tile budget the effect falls back to its procedural path."""
         return (self.EFFECT_NAMES[self.effect_mode] in self.OVERLAY_EFFECTS
                 and self.tile_manager is not None
-                and self.overlay_renderer is not None)
+                and self.overlay_renderer is not None
+                and not self.tile_manager.procedural_only)
 
     def _has_interaction_overlay(self):
         """Check if the interaction overlay system is available and enabled."""
@@ -430,6 +455,9 @@ void main() {
 
         gamma = config_data.get('gamma', self.gamma)
         current_effect = self.EFFECT_NAMES[self.effect_mode]
+        if self.tile_manager is not None:
+            # Tile budget: coarsen or drop the overlay when zoomed far out
+            self.tile_manager.update_lod(self.zoom, float(render_w) / float(render_h))
         use_overlay = self._use_overlay()
         has_interaction = self._has_interaction_overlay()
 
@@ -523,13 +551,21 @@ void main() {
                 if uniforms.get('u_depth_motion', -1) != -1:
                     glUniform1f(uniforms['u_depth_motion'], 0.0)
 
-        # Old texture-based region_blend fallback (used when overlay isn't available)
+        # Old texture-based region_blend fallback (used when overlay isn't available).
+        # Past the tile budget the CPU table is skipped too: with no table
+        # (max probe 0) the shader colours tiles procedurally.
         if current_effect == 'region_blend' and not use_overlay:
-            self._update_pattern_data_if_needed(width, height, gamma)
-            if self.pattern_texture is not None and uniforms.get('u_pattern_texture', -1) != -1:
+            over_budget = self.tile_manager is not None and self.tile_manager.procedural_only
+            if not over_budget:
+                self._update_pattern_data_if_needed(width, height, gamma)
+            has_table = (not over_budget and self.pattern_texture is not None
+                         and uniforms.get('u_pattern_texture', -1) != -1)
+            if has_table:
                 glActiveTexture(GL_TEXTURE0)
                 glBindTexture(GL_TEXTURE_2D, self.pattern_texture)
                 glUniform1i(uniforms['u_pattern_texture'], 0)
+            if uniforms.get('u_pattern_max_probe', -1) != -1:
+                glUniform1i(uniforms['u_pattern_max_probe'], self._pattern_max_probe if has_table else 0)
 
         glBindVertexArray(self.vao)
         glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_INT, None)
@@ -552,7 +588,7 @@ void main() {
         overlay_config['color2'] = [c2_r * 255.0, c2_g * 255.0, c2_b * 255.0]
         if use_overlay:
             self._update_overlay(render_w, render_h, gamma, overlay_config)
-        elif has_interaction:
+        elif has_interaction and not self.tile_manager.procedural_only:
             self._update_interaction_overlay(render_w, render_h, gamma, overlay_config)
 
         # Upscale FBO to screen if we rendered at reduced resolution
@@ -577,19 +613,31 @@ void main() {
         The heavy NumPy packing runs on the background thread — the render
         thread only does the fast GL upload (~1-2ms).
         """
+        # --- Reveal progressive Pass 1 chunks (viewport first, then rings) ---
+        for chunk_verts, chunk_data, chunk_keys, gen_id, fresh in self.tile_manager.poll_chunks():
+            # A chunk with a new gamma invalidates every slot; reset once per
+            # generation so its earlier chunks stay on screen
+            if fresh and self._slot_reset_gen_id != gen_id:
+                self.overlay_renderer.reset_slots()
+                self._slot_reset_gen_id = gen_id
+            self.overlay_renderer.add_tiles(chunk_verts, chunk_data, chunk_keys)
+
         # --- Poll for new geometry (Pass 1 result) ---
         geo_result = self.tile_manager.poll_geometry()
         if geo_result is not None:
-            gpu_verts, gpu_data, tile_count, gen_id = geo_result
+            gpu_verts, gpu_data, tile_count, gen_id, row_remap = geo_result
             self._chunk_gen_id = gen_id
 
             if self.interaction_manager:
-                self.interaction_manager.on_tiles_regenerated()
-
-            # Use glBufferSubData to avoid GPU pipeline stall from buffer orphaning
-            self.overlay_renderer.ensure_capacity(tile_count)
-            self.overlay_renderer.upload_tile_chunk(gpu_verts, gpu_data, 0, tile_count)
-            self.overlay_renderer.set_renderable_count(tile_count)
+                self.interaction_manager.on_tiles_regenerated(row_remap)
+
+            # Tiles keep their VBO slot across regenerations; only tiles new
+            # to the set are uploaded. A gamma change invalidates every slot
+            # (unless this generation's chunks already reset them).
+            if row_remap is None and self._slot_reset_gen_id != gen_id:
+                self.overlay_renderer.reset_slots()
+            self.overlay_renderer.upload_tiles(
+                gpu_verts, gpu_data, self.tile_manager.store.keys)
             self.overlay_needs_upload = False
             self.tile_manager.gpu_data_dirty = False
 
@@ -597,7 +645,7 @@ void main() {
         pat_result = self.tile_manager.poll_patterns()
         if pat_result is not None:
             (pattern_type_col, blend_factor_col, stars, bursts,
-             symmetry_tile_ids, gen_id) = pat_result
+             symmetry_indices, gen_id) = pat_result
 
             if gen_id == self._chunk_gen_id and self.tile_manager.gpu_tile_data is not None:
                 self.tile_manager.star_count = stars
@@ -608,17 +656,12 @@ void main() {
                 self.tile_manager.gpu_tile_data[:n, 1] = pattern_type_col
                 self.tile_manager.gpu_tile_data[:n, 2] = blend_factor_col
 
-                # Patch only the data VBO with updated patterns (avoids full re-upload)
-                self.overlay_renderer.upload_pattern_patch_chunk(
-                    self.tile_manager.gpu_tile_data, 0, n)
+                # Patch only the data slots whose patterns changed
+                self.overlay_renderer.update_tile_rows(self.tile_manager.gpu_tile_data)
 
                 # Pass 5-fold symmetry tile indices to interaction manager
-                if self.interaction_manager and symmetry_tile_ids:
-                    sym_indices = set()
-                    for i, tile in enumerate(self.tile_manager.tile_list):
-                        if id(tile) in symmetry_tile_ids:
-                            sym_indices.add(i)
-                    self.interaction_manager.set_symmetry_tiles(sym_indices)
+                if self.interaction_manager and len(symmetry_indices):
+                    self.interaction_manager.set_symmetry_tiles(symmetry_indices.tolist())
 
         # --- Request new generation if camera left comfort zone ---
         gamma_tuple = tuple(round(g, 4) for g in gamma)
@@ -629,7 +672,9 @@ void main() {
             self._last_gamma_for_overlay = gamma_tuple
             self.tile_manager.request_generation(
                 self.camera_x, self.camera_y, self.zoom, aspect, gamma,
-                self.velocity_x, self.velocity_y)
+                self.velocity_x, self.velocity_y, target_zoom=self.target_zoom)
+        else:
+            self._request_prefetch(gamma, aspect)
 
         # --- Depth mask management (unchanged) ---
         mask_stamp_active = (self.interaction_manager
@@ -640,6 +685,45 @@ void main() {
             if self.overlay_renderer:
                 self.overlay_renderer.set_mask_enabled(False)
 
+    def _request_prefetch(self, gamma, aspect):
+        """While the camera is moving, ask the tile manager to generate the
+        cells along its projected path ahead of time (low priority)."""
+        now = glfw.get_time()
+        if now - self._last_prefetch_time < self.prefetch_interval:
+            return
+        moving = self.velocity_x != 0.0 or self.velocity_y != 0.0
+        if not moving and (self.pan_planner is None or self.pan_planner.heading_at(0.0) is None):
+            return
+        self._last_prefetch_time = now
+        path = self.predict_camera_path(self.prefetch_horizon)
+        self.tile_manager.request_prefetch(
+            path, self.target_zoom, aspect, gamma, self.velocity_x, self.velocity_y)
+
+    def predict_camera_path(self, horizon, samples=3):
+        """Camera positions at `samples` evenly spaced times over the next
+        `horizon` seconds: integrates the current velocity and decay (plus the
+        demo's scheduled pan headings) at the 60 steps/s update() assumes."""
+        step = 1.0 / 60.0
+        steps = max(1, int(horizon * 60.0))
+        every = max(1, steps // samples)
+        x, y = self.target_camera_x, self.target_camera_y
+        vx, vy = self.velocity_x, self.velocity_y
+        path = []
+        for i in range(1, steps + 1):
+            heading = self.pan_planner.heading_at(i * step) if self.pan_planner else None
+            if heading is not None:
+                dx, dy, speed = heading
+                accel = speed / self.target_zoom * 2.0
+                vx += dx * accel
+                vy += dy * accel
+            x += vx * step
+            y += vy * step
+            vx *= self.velocity_decay
+            vy *= self.velocity_decay
+            if i % every == 0:
+                path.append((x, y))
+        return path
+
     def _update_overlay(self, width, height, gamma, config_data):
         """Manage overlay tile lifecycle and render overlay on top of base."""
         aspect = float(width) / float(height)
@@ -674,13 +758,12 @@ void main() {
                 or self.depth_mask_enabled)
 
     def _flush_interaction_dirty(self):
-        """Upload only the dirty tile range to GPU (partial buffer update)."""
+        """Upload only the dirty tiles' slots to GPU (partial buffer update)."""
         if not self.interaction_manager or not self.overlay_renderer:
             return
-        offset, count = self.interaction_manager.get_dirty_range()
-        if count > 0 and self.tile_manager.gpu_tile_data is not None:
-            self.overlay_renderer.upload_tile_data_partial(
-                self.tile_manager.gpu_tile_data, offset, count)
+        dirty = self.interaction_manager.get_dirty_indices()
+        if dirty and self.tile_manager.gpu_tile_data is not None:
+            self.overlay_renderer.update_tile_rows(self.tile_manager.gpu_tile_data, dirty)
             self.tile_manager.gpu_data_dirty = False
 
     def screen_to_pentagrid(self, screen_x, screen_y, window_width, window_height):
@@ -704,6 +787,11 @@ void main() {
 
         return pentagrid_x, pentagrid_y
     
+    def apply_settings(self, config_data):
+        """Apply optional overlay tuning keys from config_data."""
+        if self.tile_manager is not None:
+            self.tile_manager.apply_settings(config_data)
+
     # Camera controls
     def move(self, dx, dy):
         """Move camera target by delta (smooth interpolation applied in update)."""
@@ -930,58 +1018,40 @@ void main() {
         mask = np.clip(mask * 1.5 - 0.2, 0.0, 1.0)
         return mask
 
-    def _generate_tiles_for_viewport(self, width, height, gamma):
-        """Generate tile objects for the current viewport."""
-        # Estimate the world-space bounds based on camera and zoom
-        # The shader uses: vec2 p = uv * (3.0 / u_zoom) + u_camera
+    def _generate_tiles_for_viewport(self, width, height, gamma,
+                                     camera_x=None, camera_y=None, zoom=None):
+        """Generate tile objects for the viewport (the current camera unless
+        camera_x / camera_y / zoom are given)."""
+        if camera_x is None:
+            camera_x, camera_y, zoom = self.camera_x, self.camera_y, self.zoom
+
+        # Camera-space viewport, as the shader sees it:
+        # vec2 p = uv * (3.0 / u_zoom) + u_camera
         aspect = width / height
-        half_height = 3.0 / self.zoom
+        half_height = 3.0 / zoom
         half_width = half_height * aspect
 
-        # World space bounds
-        min_x = self.camera_x - half_width
-        max_x = self.camera_x + half_width
-        min_y = self.camera_y - half_height
-        max_y = self.camera_y + half_height
-
-        # Generate tiles using Operations
-        # The tiling function uses scale to determine tile density
-        # Lower scale = more tiles generated
-        #
-        # The key insight: the shader generates tiles in RIBBON SPACE, not screen space
-        # Ribbon space has a fixed tile size regardless of zoom
-        # We need to generate enough tiles to cover the visible ribbon space area
-        #
-        # Visible ribbon space area = (3.0 / zoom) * aspect for width, (3.0 / zoom) for height
-        # At zoom=1.0, we see ~3 units of ribbon space vertically
-        # At zoom=0.5, we see ~6 units of ribbon space vertically
-        #
-        # Tile size in ribbon space is roughly 1.0 unit
-        # So we need size ≈ (3.0 / zoom) tiles in each direction
-        #
-        # But Operations.tiling() uses: size = max(width, height) // (scale * 3)
-        # We want: size ≈ 3.0 / zoom
-        # So: max(width, height) // (scale * 3) ≈ 3.0 / zoom
-        # Therefore: scale ≈ max(width, height) / (9.0 / zoom) = max(width, height) * zoom / 9.0
-        #
-        # For width=800, zoom=1.0: scale = 800 * 1.0 / 9.0 ≈ 89
-        # For width=800, zoom=0.5: scale = 800 * 0.5 / 9.0 ≈ 44
-
-        virtual_scale = int(max(10, (max(width, height) * self.zoom) / 10.0))
-        virtual_width = int(width)
-        virtual_height = int(height)
-
-        # Pass camera offset to align CPU tile generation with GPU world space
-        camera_offset = complex(self.camera_x, self.camera_y)
-        tiles = self.operations.tiling(gamma, virtual_width, virtual_height, virtual_scale, camera_offset)
+        # Padded by one tile edge (1 / 2.5): a tile covering a viewport
+        # corner may have no vertex inside the viewport, and rim tiles need
+        # their neighbors for pattern detection
+        pad = 0.4
+        bounds = (camera_x - half_width - pad, camera_y - half_height - pad,
+                  camera_x + half_width + pad, camera_y + half_height + pad)
+
+        # Generate in findTile's frame (ribbon = 2.5 * p + sum(zeta * gamma)),
+        # so the table keys (r, s, kr, ks) are the ones the shader looks up
+        store = generate_tiles(bounds, gamma)
+
+        # Legacy Tile objects (ribbon-space vertices) for pattern detection
+        tiles = [
+            Tile(verts, (0, 255, 255) if (r - s) ** 2 % 5 == 1 else (0, 255, 0), r, s, kr, ks)
+            for r, s, kr, ks, verts in zip(store.r.tolist(), store.s.tolist(), store.kr.tolist(),
+                                           store.ks.tolist(), store.vertices.tolist())
+        ]
 
         # Calculate neighbors for pattern detection
         self.operations.calculate_neighbors(tiles)
 
-        # Debug: Check if neighbors were calculated (only log occasionally)
-        # tiles_with_neighbors = sum(1 for t in tiles if len(t.neighbors) > 0)
-        # self.logger.debug(f"Tiles with neighbors: {tiles_with_neighbors}/{len(tiles)}")
-
         return tiles
 
     def _detect_patterns(self, tiles):
@@ -998,19 +1068,29 @@ void main() {
         # self.logger.debug(f"Valid star kites: {valid_star_kites}, Valid starburst darts: {valid_starburst_darts}")
 
         # First pass - identify complete regions
+        vertex_index = self.operations.vertex_index(tiles)
         for tile in tiles:
             if tile not in pattern_tiles:
                 if tile.is_kite and self.operations.is_valid_star_kite(tile):
-                    star_tiles = self.operations.find_star(tile, tiles)
+                    star_tiles = self.operations.find_star(tile, tiles, vertex_index)
                     if len(star_tiles) == 5:
                         stars.append(star_tiles)
                         pattern_tiles.update(star_tiles)
                 elif not tile.is_kite and self.operations.is_valid_starburst_dart(tile):
-                    starburst_tiles = self.operations.find_starburst(tile, tiles)
+                    starburst_tiles = self.operations.find_starburst(tile, tiles, vertex_index)
                     if len(starburst_tiles) == 10:
                         starbursts.append(starburst_tiles)
                         pattern_tiles.update(starburst_tiles)
 
+        # Pattern membership (stars take precedence over starbursts)
+        membership = {}
+        for star in stars:
+            for tile in star:
+                membership.setdefault(tile, (1.0, 0.3))
+        for burst in starbursts:
+            for tile in burst:
+                membership.setdefault(tile, (2.0, 0.7))
+
         # Second pass - assign pattern data to each tile
         blend_factors_debug = []
         for tile in tiles:
@@ -1018,21 +1098,9 @@ void main() {
             blend_factor = 0.5
 
             # Check if tile is in a pattern
-            in_pattern = False
-            for star in stars:
-                if tile in star:
-                    pattern_type = 1.0
-                    blend_factor = 0.3
-                    in_pattern = True
-                    break
-
-            if not in_pattern:
-                for burst in starbursts:
-                    if tile in burst:
-                        pattern_type = 2.0
-                        blend_factor = 0.7
-                        in_pattern = True
-                        break
+            in_pattern = tile in membership
+            if in_pattern:
+                pattern_type, blend_factor = membership[tile]
 
             if not in_pattern:
                 # Calculate neighbor-based blend for non-pattern tiles
@@ -1067,28 +1135,31 @@ void main() {
 
         return patterns
 
-    def _create_pattern_texture(self, patterns):
-        """Create a texture containing pattern data for lookup in shader."""
+    def _pack_pattern_texture(self, patterns):
+        """Pack pattern data into the hashed pattern table (see PatternHash):
+        returns (float32 (height, width, 4) array, max probe) or None.
+        Pure CPU work, safe on the pattern worker thread."""
         if not patterns:
             return None
 
-        # Create a texture with pattern data indexed by centroid position
-        # Each entry: (centroid.x, centroid.y, pattern_type, blend_factor)
-        # Centroids are stored in ribbon space (same as tile.center in shader)
-        pattern_list = []
-        for tile, data in patterns.items():
-            centroid = data['centroid']  # Complex number in ribbon space
-            pattern_list.append([
-                float(centroid.real),
-                float(centroid.imag),
-                data['pattern_type'],
-                data['blend_factor']
-            ])
-
-        if not pattern_list:
+        # Keyed by lattice id (r, s, kr, ks), the same ids findTile() yields
+        tiles = list(patterns)
+        r = np.fromiter((t.r for t in tiles), dtype=np.int64, count=len(tiles))
+        s = np.fromiter((t.s for t in tiles), dtype=np.int64, count=len(tiles))
+        kr = np.fromiter((t.kr for t in tiles), dtype=np.int64, count=len(tiles))
+        ks = np.fromiter((t.ks for t in tiles), dtype=np.int64, count=len(tiles))
+        pattern_type = np.fromiter((d['pattern_type'] for d in patterns.values()),
+                                   dtype=np.float64, count=len(tiles))
+        blend_factor = np.fromiter((d['blend_factor'] for d in patterns.values()),
+                                   dtype=np.float64, count=len(tiles))
+        return pack_patterns(r, s, kr, ks, pattern_type, blend_factor)
+
+    def _upload_pattern_texture(self, packed):
+        """Upload a packed pattern table to the pattern texture (GL thread).
+        Returns the number of table slots."""
+        if packed is None:
             return None
-
-        pattern_array = np.array(pattern_list, dtype=np.float32)
+        texture_data, max_probe = packed
 
         # Create or update texture
         if self.pattern_texture is None:
@@ -1096,13 +1167,7 @@ void main() {
 
         glBindTexture(GL_TEXTURE_2D, self.pattern_texture)
 
-        # Upload as a 1D texture (width x 1) with RGBA = (centroid.x, centroid.y, pattern_type, blend_factor)
-        width = len(pattern_list)
-        height = 1
-
-        # Create texture data
-        texture_data = np.array(pattern_list, dtype=np.float32).reshape((height, width, 4))
-
+        height, width = texture_data.shape[:2]
         glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA32F, width, height, 0,
                      GL_RGBA, GL_FLOAT, texture_data)
 
@@ -1112,16 +1177,18 @@ void main() {
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
 
         glBindTexture(GL_TEXTURE_2D, 0)
+        self._pattern_max_probe = max_probe
 
-        self.logger.debug(f"Created pattern texture: {width} tiles, {height} rows")
-        # Detailed logging disabled for performance
-        # if len(pattern_list) > 0:
-        #     self.logger.debug(f"  Sample pattern[0]: centroid=({pattern_list[0][0]:.3f}, {pattern_list[0][1]:.3f}), type={pattern_list[0][2]}, blend={pattern_list[0][3]}")
-
-        return width
+        self.logger.debug(f"Created pattern table: {width}x{height}, max probe {max_probe}")
+        return width * height
 
     def _update_pattern_data_if_needed(self, width, height, gamma):
-        """Update pattern data when viewport changes."""
+        """Update pattern data when viewport changes.
+
+        Generation, pattern detection and packing run on a background
+        worker; this only posts the latest viewport and uploads a finished
+        array, so the shader keeps the previous texture meanwhile.
+        """
         # Cache based on viewport parameters
         # Use finer granularity for zoom (0.05 instead of 0.1) to catch more viewport changes
         # Especially important when zooming out, as the viewport expands rapidly
@@ -1134,26 +1201,65 @@ void main() {
             tuple(round(g, 3) for g in gamma)
         )
 
-        if self.last_pattern_params == current_params:
-            return
-
-        self.logger.info("Regenerating pattern data for region_blend")
-
-        # Generate tiles and detect patterns
-        tiles = self._generate_tiles_for_viewport(width, height, gamma)
-        self.logger.info(f"Generated {len(tiles)} tiles for viewport")
-
-        patterns = self._detect_patterns(tiles)
-        self.logger.info(f"Detected patterns for {len(patterns)} tiles")
-
-        # Create texture
-        texture_width = self._create_pattern_texture(patterns)
-
-        # Cache the patterns and parameters
-        self.pattern_cache = patterns
-        self.last_pattern_params = current_params
+        with self._pattern_cond:
+            result, self._pattern_result = self._pattern_result, None
+            if current_params not in (self.last_pattern_params, self._pattern_requested_params,
+                                      self._pattern_failed_params):
+                # Latest wins: replaces a request the worker hasn't started
+                self._pattern_request = (current_params, width, height, list(gamma),
+                                         self.camera_x, self.camera_y, self.zoom)
+                self._pattern_requested_params = current_params
+                self._pattern_failed_params = None
+                self._pattern_cond.notify()
+                if self._pattern_thread is None:
+                    self._pattern_thread = threading.Thread(
+                        target=self._pattern_worker_loop, name='PatternFallback', daemon=True)
+                    self._pattern_thread.start()
+
+        if result is not None:
+            params, patterns, packed = result
+            table_slots = self._upload_pattern_texture(packed)
+
+            # Cache the patterns and parameters
+            self.pattern_cache = patterns
+            self.last_pattern_params = params
+
+            self.logger.info(f"Pattern data updated: {len(patterns)} tiles, table slots: {table_slots}")
+
+    def _pattern_worker_loop(self):
+        """Background worker for the texture fallback: build the pattern
+        array for the latest requested viewport, one request at a time."""
+        while True:
+            with self._pattern_cond:
+                while self._pattern_request is None and not self._pattern_shutdown:
+                    self._pattern_cond.wait()
+                if self._pattern_shutdown:
+                    return
+                request, self._pattern_request = self._pattern_request, None
+
+            params, width, height, gamma, camera_x, camera_y, zoom = request
+            try:
+                self.logger.info("Regenerating pattern data for region_blend")
+
+                # Generate tiles and detect patterns
+                tiles = self._generate_tiles_for_viewport(width, height, gamma, camera_x, camera_y, zoom)
+                self.logger.info(f"Generated {len(tiles)} tiles for viewport")
+
+                patterns = self._detect_patterns(tiles)
+                self.logger.info(f"Detected patterns for {len(patterns)} tiles")
+
+                packed = self._pack_pattern_texture(patterns)
+            except Exception as e:
+                self.logger.error(f"Pattern fallback generation failed: {e}", exc_info=True)
+                with self._pattern_cond:
+                    # Don't retry this viewport every frame; the next view change will
+                    self._pattern_failed_params = params
+                    if self._pattern_requested_params == params:
+                        self._pattern_requested_params = None
+                continue
 
-        self.logger.info(f"Pattern data updated: {len(patterns)} tiles, texture width: {texture_width}")
+            with self._pattern_cond:
+                self._pattern_result = (params, patterns, packed)
 
     def update(self):
         """Update camera position and zoom with smooth interpolation."""
@@ -1210,6 +1316,10 @@ void main() {
         return self.camera_y
     
     def __del__(self):
+        if hasattr(self, '_pattern_cond'):
+            with self._pattern_cond:
+                self._pattern_shutdown = True
+                self._pattern_cond.notify()
         if self.tile_manager:
             self.tile_manager.shutdown()
         if glfw.get_current_context():
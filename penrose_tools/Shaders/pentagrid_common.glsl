@@ -136,6 +136,40 @@ TileData findTile(vec2 p, float gamma[5]) {
     return tile;
 }
 
+// Pattern table for the texture fallback (packed by penrose_tools/PatternHash.py):
+// open addressing with linear probing over a 2D RGBA32F texture, one texel per
+// slot = (kr, ks, (r*5 + s + 1) + 32 * patternType, blendFactor), B == 0 empty
+uint patternHash(int r, int s, int kr, int ks) {
+    uint h = (uint(kr + 32768) * 73856093u) ^ (uint(ks + 32768) * 19349663u) ^ (uint(r * 5 + s) * 83492791u);
+    h ^= h >> 16u;
+    h *= 0x7feb352du;
+    h ^= h >> 15u;
+    return h;
+}
+
+// Look up a tile's pattern; maxProbe is the table's longest probe run
+bool lookupPattern(highp sampler2D table, int maxProbe, int r, int s, float kr, float ks,
+                   out float patternType, out float blendFactor) {
+    patternType = 0.0;
+    blendFactor = 0.5;
+    ivec2 size = textureSize(table, 0);
+    uint width = uint(size.x);
+    uint mask = uint(size.x * size.y) - 1u;
+    uint slot = patternHash(r, s, int(kr), int(ks)) & mask;
+    float code = float(r * 5 + s + 1);
+    for (int i = 0; i < maxProbe; i++) {
+        vec4 texel = texelFetch(table, ivec2(int(slot % width), int(slot / width)), 0);
+        if (texel.b == 0.0) return false;
+        if (texel.r == kr && texel.g == ks && mod(texel.b, 32.0) == code) {
+            patternType = floor(texel.b / 32.0);
+            blendFactor = texel.a;
+            return true;
+        }
+        slot = (slot + 1u) & mask;
+    }
+    return false;
+}
+
 // Apply edge rendering to tile color
 vec3 applyEdge(vec3 tileColor, float edgeDist, float edgeThickness) {
     float edgeWidth = 0.012 * edgeThickness;
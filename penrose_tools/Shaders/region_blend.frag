@@ -0,0 +1,58 @@
+// region_blend.frag - Procedural region blend for the texture fallback
+// Pattern data comes from the hashed pattern table (used when the overlay is unavailable)
+#version 140
+
+in vec2 v_uv;
+out vec4 fragColor;
+
+uniform vec2 u_resolution;
+uniform vec2 u_camera;
+uniform float u_zoom;
+uniform float u_time;
+uniform vec3 u_color1;
+uniform vec3 u_color2;
+uniform float u_edge_thickness;
+uniform float u_gamma[5];
+uniform highp sampler2D u_pattern_texture;  // RGBA32F: highp keeps kr, ks exact on GLES
+uniform int u_pattern_max_probe;  // 0 = no table yet
+
+#include "pentagrid_common.glsl"
+
+void main() {
+    vec2 uv = v_uv - 0.5;
+    uv.x *= u_resolution.x / u_resolution.y;
+
+    float gSc = 3.0 / u_zoom;
+    vec2 p = uv * gSc + u_camera;
+
+    float gamma[5];
+    for (int i = 0; i < 5; i++) gamma[i] = u_gamma[i];
+
+    TileData tile = findTile(p, gamma);
+
+    if (!tile.found) {
+        fragColor = vec4(0.1, 0.1, 0.1, 1.0);
+        return;
+    }
+
+    vec3 tileColor = tile.isFat ? u_color1 : u_color2;
+    float patternType;
+    float blendFactor;
+    if (lookupPattern(u_pattern_texture, u_pattern_max_probe, tile.r, tile.s, tile.kr, tile.ks,
+                      patternType, blendFactor)) {
+        if (patternType > 0.9 && patternType < 1.1) {
+            // Star pattern (kites): inversion of color1
+            tileColor = vec3(1.0) - u_color1;
+        } else if (patternType > 1.9 && patternType < 2.1) {
+            // Starburst pattern (darts): inversion of color2
+            tileColor = vec3(1.0) - u_color2;
+        } else {
+            // 0 = dart-heavy neighborhood -> color2, 1 = kite-heavy -> color1
+            tileColor = mix(u_color1, u_color2, clamp(blendFactor, 0.0, 1.0));
+        }
+    }
+
+    vec3 finalColor = applyEdge(tileColor, tile.edgeDist, u_edge_thickness);
+
+    fragColor = vec4(finalColor, 1.0);
+}
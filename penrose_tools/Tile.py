@@ -4,28 +4,44 @@ import cmath  # For complex number operations
 import random
 
 class Tile:
-    def __init__(self, vertices, color=(255, 255, 255)):
+    """
+    Tile of the legacy (texture fallback) pipeline.
+    Only vertices, colors and neighbors are set up front; angles, the
+    kite/dart type, the highlighted color, the temperature and the hash are
+    computed on first use. Vertices must not change after construction.
+    """
+    __slots__ = (
+        'vertices', 'neighbors', 'color', 'original_color', 'highlighted',
+        'r', 's', 'kr', 'ks',
+        '_angles', '_is_kite', '_highlighted_color', '_hash',
+        '_current_temperature', '_target_temperature',
+    )
+
+    def __init__(self, vertices, color=(255, 255, 255), r=None, s=None, kr=None, ks=None):
         self.vertices = self.clamp_vertices(vertices)
         self.neighbors = []
         self.color = self.clamp_color(color)
         self.original_color = self.color
-        self.current_temperature = random.uniform(20, 30)
-        self.target_temperature = self.current_temperature
         self.highlighted = False
-        self.angles = self.calculate_angles()
-        self.is_kite = self.is_kite()
-        #invert color for highlinghted tiles
-        self.highlighted_color = self.clamp_color(tuple(255 - c for c in self.color))
         # Pentagrid parameters (set by Operations.tiling if available)
-        self.r: int | None = None
-        self.s: int | None = None
-        self.kr: int | None = None
-        self.ks: int | None = None
+        self.r: int | None = r
+        self.s: int | None = s
+        self.kr: int | None = kr
+        self.ks: int | None = ks
+        # Lazily computed
+        self._angles = None
+        self._is_kite = None
+        self._highlighted_color = None
+        self._hash = None
+        self._current_temperature = None
+        self._target_temperature = None
 
     def __hash__(self):
-        # Hash based on a tuple of vertices and color
-        return hash((tuple(self.vertices), self.color))
-    
+        # Hash based on the vertices (equal tiles have equal vertices)
+        if self._hash is None:
+            self._hash = hash(tuple(self.vertices))
+        return self._hash
+
     def __eq__(self, other):
         if not isinstance(other, Tile):
             return False
@@ -34,11 +50,58 @@ class Tile:
     def clamp_color(self, color):
         """Ensure all color values are within the legal RGB range."""
         return tuple(max(0, min(255, int(c))) for c in color)
-    
+
     def clamp_vertices(self, vertices, precision=12):
         """Clamp vertices to a higher precision."""
         return [complex(round(v.real, precision), round(v.imag, precision)) for v in vertices]
-    
+
+    @property
+    def angles(self):
+        """Interior angle at each vertex (radians)."""
+        if self._angles is None:
+            self._angles = self.calculate_angles()
+        return self._angles
+
+    @property
+    def is_kite(self):
+        """True for the fat rhombus (all angles below 120 degrees)."""
+        if self._is_kite is None:
+            if self.r is not None and self.s is not None:
+                # From the pentagrid indices, as TileStore does: grid
+                # directions 1 or 4 steps apart give the fat rhombus
+                self._is_kite = (self.s - self.r) % 5 in (1, 4)
+            else:
+                self._is_kite = all(angle < (2 * cmath.pi / 3) for angle in self.angles)
+        return self._is_kite
+
+    @property
+    def highlighted_color(self):
+        """Inverted (original) color used for highlighted tiles."""
+        if self._highlighted_color is None:
+            self._highlighted_color = self.clamp_color(tuple(255 - c for c in self.original_color))
+        return self._highlighted_color
+
+    @property
+    def current_temperature(self):
+        if self._current_temperature is None:
+            self._current_temperature = random.uniform(20, 30)
+        return self._current_temperature
+
+    @current_temperature.setter
+    def current_temperature(self, value):
+        self._current_temperature = value
+
+    @property
+    def target_temperature(self):
+        # Starts at the initial temperature
+        if self._target_temperature is None:
+            self._target_temperature = self.current_temperature
+        return self._target_temperature
+
+    @target_temperature.setter
+    def target_temperature(self, value):
+        self._target_temperature = value
+
     def calculate_angles(self):
         """Calculate angles at each vertex of the tile using the correct phase calculation."""
         angles = []
@@ -54,17 +117,12 @@ class Tile:
             angles.append(angle)
         return angles
 
-    def is_kite(self):
-        """Determine if the tile is a kite based on its angles."""
-        # Assuming specific angle criteria to differentiate kites and darts
-        return all(angle < (2 * cmath.pi / 3) for angle in self.angles)  # Placeholder condition
-
     def normalized_edge(self, vertex1, vertex2):
         """Sort vertices based on their real parts first, and then imaginary parts if real parts are equal."""
         v1 = complex(round(vertex1.real, 8), round(vertex1.imag, 8))
         v2 = complex(round(vertex2.real, 8), round(vertex2.imag, 8))
         return (v1, v2) if (v1.real, v1.imag) < (v2.real, v2.imag) else (v2, v1)
-    
+
     def edges(self):
         """ Generate normalized edges for better comparison efficiency. """
         n_vertices = [self.normalized_edge(self.vertices[i], self.vertices[(i + 1) % len(self.vertices)]) for i in range(len(self.vertices))]
@@ -74,10 +132,9 @@ class Tile:
         """ Add a neighboring tile to the neighbors list if it's not already included. """
         if neighbor_tile not in self.neighbors:
             self.neighbors.append(neighbor_tile)
-    
+
 
 
     def update_color(self, new_color):
         """Update the color of the tile, clamping values to ensure validity."""
         self.color = self.clamp_color(new_color)
-    
\ No newline at end of file
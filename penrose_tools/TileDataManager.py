@@ -1,19 +1,80 @@
 # penrose_tools/TileDataManager.py
 """
 Manages tile lifecycle for the overlay rendering system.
-- Generates OverlayTile objects using pentagrid math
+- Generates tiles into a structure-of-arrays TileStore using pentagrid math
 - Builds neighbor graph via edge hashing
 - Detects star/starburst patterns using spatial vertex index (O(1) per lookup)
-- Runs generation on a background thread to avoid render stalls
+- Runs generation on a persistent background thread fed by a latest-wins queue
+- Caches generated geometry per fixed world cell so pans only build new cells
+- Optionally persists cells to a size-capped on-disk cache for warm starts
+- Keeps recent complete tile sets (patterns and GPU arrays included) so
+  returning to a recent gamma only costs a GPU upload
 - Implements comfort zone / generation zone viewport management
+- Hit tests analytically from a point's grid indices (no scan over tiles)
+- Caps the zone at a tile budget, coarsening or handing off to the
+  procedural shader path when zoomed far out
 """
 import cmath
+import copy
 import logging
 import math
 import threading
 import time
+from collections import OrderedDict, deque
 import numpy as np
-from penrose_tools.OverlayTile import OverlayTile
+from penrose_tools.CellDiskCache import CellDiskCache
+from penrose_tools.TileStore import (
+    TileStore, generate_tiles, pack_keys, tile_ids, locate_keys, COL_IS_KITE, COL_PATTERN_TYPE,
+    COL_BLEND_FACTOR, COL_SELECTED, COL_HOVERED, COL_ANIM_PHASE,
+    COL_ANIM_TYPE, COL_TILE_ID)
+
+# Mean overlay tile density in camera space (tiles per unit area): edges are
+# 1/2.5 long and fat and thin rhombi occur in the golden ratio
+_PHI = (1.0 + math.sqrt(5.0)) / 2.0
+TILES_PER_AREA = (1.0 + _PHI) / (
+    0.16 * (_PHI * math.sin(2.0 * math.pi / 5.0) + math.sin(math.pi / 5.0)))
+
+
+class GenerationJob:
+    """One queued generation request. Doubles as its cancellation token:
+    the worker polls `cancelled` between stages and drops the job's results
+    once it is set.
+    """
+
+    __slots__ = ('gen_bounds', 'comfort_bounds', 'gamma', 'generation_id',
+                 'view_bounds', 'velocity', 'requested_at', 'cancelled')
+
+    def __init__(self, gen_bounds, comfort_bounds, gamma, generation_id,
+                 view_bounds=None, velocity=(0.0, 0.0)):
+        self.gen_bounds = gen_bounds
+        self.comfort_bounds = comfort_bounds
+        self.gamma = gamma
+        self.generation_id = generation_id
+        self.view_bounds = view_bounds   # viewport at request time (delivered first)
+        self.velocity = velocity
+        self.requested_at = time.perf_counter()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class PrefetchJob:
+    """Low-priority request to warm the cell cache for zones the camera is
+    predicted to reach. Never staged for display; any foreground request
+    pre-empts (cancels) it.
+    """
+
+    __slots__ = ('bounds', 'gamma', 'requested_at', 'cancelled')
+
+    def __init__(self, bounds, gamma):
+        self.bounds = bounds      # generation zones, nearest first
+        self.gamma = gamma
+        self.requested_at = time.perf_counter()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
 
 
 class TileDataManager:
@@ -23,30 +84,86 @@ class TileDataManager:
     packed GPU buffer data. All heavy work runs on a background thread.
     """
 
+    # Level of detail for the overlay zones
+    LOD_FULL = 0         # generation zone with full margins
+    LOD_COARSE = 1       # margins skipped: viewport plus a thin rim
+    LOD_PROCEDURAL = 2   # over budget even then: no overlay tiles
+
+    # Zone margins per level as fractions of the viewport half-size:
+    # (minimum gen margin, (comfort base, comfort at full speed)).
+    # Beyond the minimum, the gen margin is the comfort margin plus the
+    # runway the camera covers while a generation is in flight.
+    ZONE_MARGINS = {
+        LOD_FULL: (0.8, (0.4, 0.7)),
+        LOD_COARSE: (0.15, (0.05, 0.1)),
+    }
+    MAX_GEN_MARGIN = 2.5          # cap, in viewport half-sizes per side
+    RUNWAY_SAFETY = 1.5           # runway = speed * expected latency * this
+    DEFAULT_LATENCY_MS = 150.0    # expected latency before any job has finished
+
     def __init__(self):
         self.logger = logging.getLogger('TileDataManager')
 
         # Fifth roots of unity (same as Operations)
         self.zeta = [cmath.exp(2j * cmath.pi * i / 5) for i in range(5)]
 
-        # Current tile set keyed by (r, s, kr, ks)
-        self.tiles = {}          # dict[tuple, OverlayTile]
-        self.tile_list = []      # ordered list for GPU buffer packing
-        self._tile_index_map = {}  # id(tile) → index for O(1) lookup
+        # Current tile set (row index = tile index = GPU instance index)
+        self.store = TileStore.empty()
 
         # Viewport zones (in world/ribbon space)
         self.gen_bounds = None   # (min_x, min_y, max_x, max_y) - generation zone
         self.comfort_bounds = None  # comfort zone - regen triggers when camera exits this
 
-        # Background thread state
+        # Background generation service: one long-lived worker thread fed by
+        # a bounded queue. When the queue is full the oldest job is cancelled
+        # and dropped (latest request wins). The running job is never
+        # superseded, so it can always deliver its results.
         self._lock = threading.Lock()
+        self._queue_cond = threading.Condition(self._lock)
+        self.queue_size = 1
+        self._queue = deque()
+        self._prefetch_job = None   # pending PrefetchJob, runs only when the queue is empty
+        self._current_job = None
+        self._latest_job = None     # newest GenerationJob; its zones count as current
         self._worker_thread = None
-        self._pending_result = None  # (tiles_dict, tile_list) from background thread
-        self._pending_request = None  # queued request when worker is busy
-        self._generation_in_progress = False
         self._shutdown = False
 
-        # GPU buffer data (packed numpy arrays, ready for upload)
+        # Generation service stats (see get_generation_stats)
+        self._stats = {
+            'requests': 0,
+            'superseded': 0,
+            'completed': 0,
+            'cancelled': 0,
+            'chunks': 0,                  # progressive geometry chunks staged
+            'first_chunk_latency_ms': 0.0,  # moving averages, request -> staged
+            'geometry_latency_ms': 0.0,
+            'patterns_latency_ms': 0.0,
+            'tileset_hits': 0,
+            'prefetch_requests': 0,
+            'prefetch_preempted': 0,
+            'prefetch_cells': 0,          # cells generated ahead of the camera
+            'lod_level': 0,
+            'lod_switches': 0,
+            'estimated_tiles': 0,         # full-zone estimate at the last LOD check
+        }
+
+        # Tile budget and level of detail. Past max_tiles (estimated from the
+        # zone area) the zones coarsen to the viewport; past it even then the
+        # overlay hands off to the procedural shader path. A level is only
+        # left once the estimate drops below lod_hysteresis * max_tiles, so
+        # zooming around the boundary doesn't thrash.
+        self.max_tiles = 60000       # 0 = unlimited
+        self.lod_hysteresis = 0.8
+        self.lod_level = self.LOD_FULL
+        self._zones_lod = None       # lod_level the current zones were computed at
+
+        # Zones are sized for log-scale zoom buckets (zoom_bucket_ratio apart),
+        # so zooming within a bucket never escapes them: zooming in keeps the
+        # superset and lets the GPU cull, zooming out generates one bucket
+        # ahead. A ratio <= 1 sizes zones for the exact zoom.
+        self.zoom_bucket_ratio = 1.5
+
+        # GPU buffer data (views of self.store, ready for upload)
         self.gpu_vertices = None     # float32, shape (N, 4, 2) - quad corners
         self.gpu_tile_data = None    # float32, shape (N, 8) - per-tile attributes
         self.gpu_data_dirty = False  # True when new data is ready for upload
@@ -59,37 +176,251 @@ class TileDataManager:
         # Current gamma (needed for ribbon->camera space conversion)
         self._current_gamma = [0.0, 0.0, 0.0, 0.0, 0.0]
 
-        # Tile geometry cache: reuse tiles across regenerations when gamma is unchanged.
-        # Keyed by (r, s, kr, ks) -> OverlayTile with valid vertices.
-        self._tile_cache = {}         # dict[tuple, OverlayTile]
-        self._cache_gamma = None      # gamma tuple the cache was built with
-
         # Two-pass staged results for incremental loading
-        self._staged_geometry = None   # (tiles_dict, tile_list, gpu_verts, gpu_data,
-                                       #  gen_bounds, comfort_bounds, gamma, gen_id)
-        self._staged_patterns = None   # (pattern_type_col, blend_factor_col, stars, bursts, gen_id)
+        self._staged_geometry = None   # (store, gen_bounds, comfort_bounds, gamma, gen_id)
+        self._staged_patterns = None   # (pattern_type_col, blend_factor_col, stars, bursts,
+                                       #  symmetry_indices, gen_id)
+
+        # Progressive Pass 1: the zone's cells are generated in chunks (the
+        # viewport first, then rings outward / ahead of the motion) and each
+        # packed chunk is staged for upload before the whole zone is done.
+        # 1 = deliver the zone in one piece.
+        self.progressive_chunks = 2
+        self._staged_chunks = []       # [(TileStore, gamma, gen_id), ...]
+
+        # Carry-over patterns: preserve blend_factor from previous generation
+        # so Pass 1 geometry doesn't flash to flat 0.5 while Pass 2 computes.
+        # (keys, pattern_type_col, blend_factor_col) of the last finished store.
+        self._prev_patterns = None
+
+        # Sequence number stamped on each job; lets the renderer match a
+        # Pass 2 result to the geometry it belongs to
+        self._generation_id = 0
 
-        # Carry-over blend map: preserve blend_factor from previous generation
-        # so Pass 1 geometry doesn't flash to flat 0.5 while Pass 2 computes
-        self._prev_blend_map = {}      # dict[(r,s,kr,ks) -> float]
+        # Candidate search mode for generate_tiles:
+        #   True  = exact parallelogram of (kr, ks) per (r, s) pair
+        #   False = legacy square window around the viewport centre
+        self.exact_index_ranges = True
+
+        # Pass 2 neighbor source:
+        #   False = hash shared lattice edges (_calculate_neighbors)
+        #   True  = walk each tile's two grid lines to the next crossings
+        #           (_analytic_neighbors); no edge hashing or validity scan
+        self.analytic_patterns = False
+
+        # Region blend diffusion: each pass sets every tile to
+        # self_weight * own value + (1 - self_weight) * neighbor mean
+        self.blend_passes = 2
+        self.blend_self_weight = 0.4
+
+        # World-cell streaming cache: the plane is split into fixed square
+        # cells (camera space). Each tile belongs to the cell containing its
+        # centroid. Cell geometry is kept in an LRU keyed by (gamma, cx, cy)
+        # so a pan only generates the newly exposed cells. Worker-thread only.
+        self.cell_size = 2.0
+        self.cell_cache_budget = 64 * 1024 * 1024   # bytes
+        self._cell_cache = OrderedDict()  # (gamma, cx, cy) -> (r, s, k)
+        self._cell_cache_bytes = 0
+        self._cell_cache_size = self.cell_size   # cell_size the cache was cut with
+
+        # Optional on-disk cell cache (CellDiskCache; None = disabled). Cells
+        # generated this session are written after Pass 2, with their final
+        # pattern columns; cells read back seed pattern carry-over so a warm
+        # start doesn't flash flat colours. Worker-thread only: settings
+        # changes are picked up by the worker between jobs.
+        self.disk_cache_dir = None
+        self.disk_cache_budget = 256 * 1024 * 1024   # bytes
+        self._disk_cache = None
+        self._disk_cache_config = (None, self.disk_cache_budget)   # what _disk_cache was opened with
+        self._unsaved_cells = set()    # cell keys not yet written to disk
+        self._pattern_seeds = {}       # cell key -> (pattern_type, blend_factor) from disk
+
+        # Complete tile sets (store with packed GPU arrays and pattern
+        # columns, plus Pass 2 counts) in an LRU keyed by rounded gamma, the
+        # cell set and the pattern settings. Switching back to a recent gamma
+        # at the same view skips both passes. Worker-thread only.
+        self.tileset_cache_budget = 48 * 1024 * 1024   # bytes
+        self._tileset_cache = OrderedDict()  # key -> (store, stars, bursts, symmetry_indices, nbytes)
+        self._tileset_cache_bytes = 0
+
+        # Optional process pool for cell generation (0 = generate on the
+        # worker thread). Created once, by the first apply_settings call,
+        # before any generation thread exists: forking a multithreaded
+        # process is unsafe, and the worker may be inside the pool at any
+        # time afterwards. Reloads never resize it.
+        self.process_workers = 0
+        self._process_pool = None
+        self._process_pool_configured = False
+
+    def apply_settings(self, settings):
+        """Apply optional overlay tuning keys (see Operations.OVERLAY_SETTINGS).
+        Takes effect from the next generation.
+        """
+        if 'overlay_blend_passes' in settings:
+            self.blend_passes = max(0, int(settings['overlay_blend_passes']))
+        if 'overlay_blend_self_weight' in settings:
+            self.blend_self_weight = min(1.0, max(0.0, float(settings['overlay_blend_self_weight'])))
+        if 'overlay_cell_size' in settings:
+            cell_size = max(0.5, float(settings['overlay_cell_size']))
+            # Cached cells are only valid for the size they were cut with;
+            # the worker drops them on its next run
+            self.cell_size = cell_size
+        if 'overlay_cell_cache_mb' in settings:
+            self.cell_cache_budget = max(0, int(float(settings['overlay_cell_cache_mb']) * 1024 * 1024))
+        if 'overlay_disk_cache_dir' in settings or 'overlay_disk_cache_mb' in settings:
+            self._set_disk_cache(
+                settings.get('overlay_disk_cache_dir', self.disk_cache_dir),
+                settings.get('overlay_disk_cache_mb', self.disk_cache_budget / 1048576.0))
+        if 'overlay_tileset_cache_mb' in settings:
+            self.tileset_cache_budget = max(0, int(float(settings['overlay_tileset_cache_mb']) * 1024 * 1024))
+        if 'overlay_analytic_patterns' in settings:
+            self.analytic_patterns = bool(settings['overlay_analytic_patterns'])
+        if 'overlay_progressive_chunks' in settings:
+            self.progressive_chunks = max(1, int(settings['overlay_progressive_chunks']))
+        if 'overlay_zoom_bucket_ratio' in settings:
+            self.zoom_bucket_ratio = max(1.0, float(settings['overlay_zoom_bucket_ratio']))
+        if 'overlay_max_tiles' in settings:
+            self.max_tiles = max(0, int(settings['overlay_max_tiles']))
+        workers = max(0, int(settings.get('overlay_process_workers', self.process_workers)))
+        if not self._process_pool_configured:
+            self._process_pool_configured = True
+            self._start_process_pool(workers)
+        elif workers != self.process_workers:
+            self.logger.info(f"overlay_process_workers={workers} takes effect on restart "
+                             f"(keeping {self.process_workers})")
+
+    def _set_disk_cache(self, directory, budget_mb):
+        """Enable, resize or disable (empty directory) the on-disk cell cache.
+        The worker may be mid-load or mid-save on the open cache, so only
+        the settings change here; _sync_disk_cache applies them between jobs.
+        """
+        self.disk_cache_dir = (directory or '').strip() or None
+        self.disk_cache_budget = max(0, int(float(budget_mb) * 1024 * 1024))
 
-        # Generation ID for interruption handling
-        self._generation_id = 0
-        self._active_generation_id = 0
+    def _sync_disk_cache(self):
+        """Reopen the on-disk cell cache if its settings changed (worker thread)."""
+        config = (self.disk_cache_dir, self.disk_cache_budget)
+        if config == self._disk_cache_config:
+            return
+        self._disk_cache_config = config
+        directory, budget = config
+        self._disk_cache = CellDiskCache(directory, budget) if directory else None
+
+    def _start_process_pool(self, workers):
+        """Start the generation process pool (once, before any threads)."""
+        if workers <= 0:
+            return
+        if self._worker_thread is not None:
+            self.logger.warning("Generation thread already running; not forking a process pool")
+            return
+        try:
+            from penrose_tools.TileWorkerPool import TileWorkerPool
+            self._process_pool = TileWorkerPool(workers)
+            self.process_workers = workers
+        except Exception as e:
+            self.logger.warning(f"Process pool unavailable, generating on thread: {e}")
 
     def shutdown(self):
-        """Signal background thread to stop."""
-        self._shutdown = True
+        """Cancel all jobs and stop the background thread."""
+        with self._queue_cond:
+            self._shutdown = True
+            self._cancel_jobs()
+            self._queue_cond.notify_all()
         if self._worker_thread and self._worker_thread.is_alive():
             self._worker_thread.join(timeout=2.0)
+        if self._process_pool is not None:
+            self._process_pool.close()
+            self._process_pool = None
+
+    # -------------------------------------------------------------------------
+    # Tile budget / level of detail
+    # -------------------------------------------------------------------------
+
+    @property
+    def procedural_only(self):
+        """True when the overlay is over budget and rendering should use the
+        procedural shader path alone."""
+        return self.lod_level == self.LOD_PROCEDURAL
+
+    def estimate_tiles(self, zoom, aspect, level=LOD_FULL):
+        """Estimated tile count of a generation zone (at rest) for a level.
+        _compute_zones caps moving zones at max(this, max_tiles), so the
+        budget the LOD decision checks also holds at pan speed."""
+        half_h = 3.0 / zoom
+        half_w = half_h * aspect
+        margin = self.ZONE_MARGINS[level][0]
+        return 4.0 * half_w * half_h * (1.0 + margin) ** 2 * TILES_PER_AREA
+
+    def update_lod(self, zoom, aspect):
+        """Re-evaluate the level of detail for the viewport. Cheap enough to
+        call every frame. Entering LOD_PROCEDURAL cancels pending jobs; any
+        level change makes needs_regeneration() report True.
+        Returns the current level.
+        """
+        zoom = self.zoom_bucket(zoom)
+        full = self.estimate_tiles(zoom, aspect, self.LOD_FULL)
+        level = self.lod_level
+        if self.max_tiles <= 0:
+            level = self.LOD_FULL
+        else:
+            coarse = self.estimate_tiles(zoom, aspect, self.LOD_COARSE)
+            budget = self.max_tiles
+            low = budget * self.lod_hysteresis
+            if level == self.LOD_FULL and full > budget:
+                level = self.LOD_COARSE
+            if level == self.LOD_COARSE and coarse > budget:
+                level = self.LOD_PROCEDURAL
+            if level == self.LOD_PROCEDURAL and coarse < low:
+                level = self.LOD_COARSE
+            if level == self.LOD_COARSE and full < low:
+                level = self.LOD_FULL
+
+        with self._lock:
+            self._stats['estimated_tiles'] = int(full)
+            if level != self.lod_level:
+                self._stats['lod_level'] = level
+                self._stats['lod_switches'] += 1
+                if level == self.LOD_PROCEDURAL:
+                    self._cancel_jobs()
+        if level != self.lod_level:
+            names = ('full', 'coarse', 'procedural-only')
+            self.logger.info(f"Overlay LOD {names[self.lod_level]} -> {names[level]} "
+                             f"(~{int(full)} tiles, budget {self.max_tiles})")
+            self.lod_level = level
+        return level
 
     # -------------------------------------------------------------------------
     # Viewport zone management
     # -------------------------------------------------------------------------
 
+    def zoom_bucket(self, zoom):
+        """Widest (smallest) zoom of the log-scale bucket containing zoom."""
+        ratio = self.zoom_bucket_ratio
+        if ratio <= 1.0:
+            return zoom
+        return ratio ** math.floor(math.log(zoom) / math.log(ratio) + 1e-9)
+
+    def _zone_zoom(self, zoom, aspect, target_zoom=None):
+        """Zoom the zones are sized for: the bucket of zoom, or the next
+        bucket out when zooming out past it (if that fits the tile budget)."""
+        bucket = self.zoom_bucket(zoom)
+        if target_zoom is None or target_zoom >= bucket or self.zoom_bucket_ratio <= 1.0:
+            return bucket
+        ahead = bucket / self.zoom_bucket_ratio
+        level = min(self.lod_level, self.LOD_COARSE)
+        if self.max_tiles > 0 and self.estimate_tiles(ahead, aspect, level) > self.max_tiles:
+            return bucket
+        return ahead
+
     def needs_regeneration(self, camera_x, camera_y, zoom, aspect):
-        """Check if camera has moved outside the comfort zone."""
-        if self.comfort_bounds is None:
+        """Check if camera has moved outside the comfort zone, or the zones
+        were computed for another level of detail. While a job is in flight
+        its comfort zone counts, so one escape queues one job, not one per
+        frame until the geometry lands."""
+        job = self._latest_job
+        comfort = (job.comfort_bounds if job is not None and not job.cancelled
+                   else self.comfort_bounds)
+        if comfort is None or self._zones_lod != self.lod_level:
             return True
 
         half_h = 3.0 / zoom
@@ -99,17 +430,29 @@ class TileDataManager:
         view_min_y = camera_y - half_h
         view_max_y = camera_y + half_h
 
-        cmin_x, cmin_y, cmax_x, cmax_y = self.comfort_bounds
+        cmin_x, cmin_y, cmax_x, cmax_y = comfort
         return (view_min_x < cmin_x or view_max_x > cmax_x or
                 view_min_y < cmin_y or view_max_y > cmax_y)
 
+    def expected_latency(self):
+        """Expected request -> patterns latency in seconds, from the moving
+        average of finished jobs (Pass 1 + Pass 2 including queueing)."""
+        # Single float reads; no lock needed (request_generation calls
+        # _compute_zones without holding it)
+        ms = self._stats['patterns_latency_ms'] or self._stats['geometry_latency_ms']
+        return (ms or self.DEFAULT_LATENCY_MS) / 1000.0
+
     def _compute_zones(self, camera_x, camera_y, zoom, aspect,
                         velocity_x=0.0, velocity_y=0.0):
         """Compute generation zone and comfort zone.
 
-        Both zones scale with velocity to provide more runway at high speed.
-        The generation zone is biased in the movement direction so tiles are
-        ready before the user pans into view.
+        The comfort zone scales with speed, and the generation zone extends
+        past it by at least the distance the camera covers during one
+        generation (velocity * expected latency), so slow hardware gets
+        bigger zones and fast hardware keeps them small. Both are biased in
+        the movement direction so tiles are ready before the user pans into
+        view. Minimum margins come from ZONE_MARGINS for the current level
+        of detail.
         """
         half_h = 3.0 / zoom
         half_w = half_h * aspect
@@ -131,9 +474,23 @@ class TileDataManager:
         cx = camera_x + bias_x
         cy = camera_y + bias_y
 
-        # Generation zone: 80-120% larger than viewport (scales with speed)
-        gen_margin_w = half_w * (0.8 + 0.4 * speed_factor)
-        gen_margin_h = half_h * (0.8 + 0.4 * speed_factor)
+        gen_rest, (comfort_rest, comfort_fast) = self.ZONE_MARGINS[
+            min(self.lod_level, self.LOD_COARSE)]
+
+        # Comfort zone: 40-70% larger than viewport at full detail (scales with speed)
+        comfort_margin = comfort_rest + (comfort_fast - comfort_rest) * speed_factor
+
+        # Generation zone: the view leaves the comfort zone, then travels
+        # for one generation's latency before the new tiles arrive
+        latency = self.expected_latency()
+        max_margin_w = half_w * self.MAX_GEN_MARGIN
+        max_margin_h = half_h * self.MAX_GEN_MARGIN
+        gen_margin_w = min(max_margin_w, half_w * comfort_margin + max(
+            half_w * (gen_rest - comfort_rest), abs(velocity_x) * latency * self.RUNWAY_SAFETY))
+        gen_margin_h = min(max_margin_h, half_h * comfort_margin + max(
+            half_h * (gen_rest - comfort_rest), abs(velocity_y) * latency * self.RUNWAY_SAFETY))
+        gen_margin_w, gen_margin_h = self._fit_tile_budget(
+            half_w, half_h, half_w * gen_rest, half_h * gen_rest, gen_margin_w, gen_margin_h)
         gen_bounds = (
             cx - half_w - gen_margin_w,
             cy - half_h - gen_margin_h,
@@ -141,9 +498,8 @@ class TileDataManager:
             cy + half_h + gen_margin_h,
         )
 
-        # Comfort zone: 40-70% larger than viewport (scales with speed)
-        comfort_margin_w = half_w * (0.4 + 0.3 * speed_factor)
-        comfort_margin_h = half_h * (0.4 + 0.3 * speed_factor)
+        comfort_margin_w = half_w * comfort_margin
+        comfort_margin_h = half_h * comfort_margin
         comfort_bounds = (
             cx - half_w - comfort_margin_w,
             cy - half_h - comfort_margin_h,
@@ -153,48 +509,149 @@ class TileDataManager:
 
         return gen_bounds, comfort_bounds
 
+    def _fit_tile_budget(self, half_w, half_h, rest_w, rest_h, margin_w, margin_h):
+        """Shrink gen margins grown past the at-rest ones (rest_w, rest_h) by
+        speed and runway, so the zone holds at most max_tiles tiles. The part
+        beyond rest is scaled by one factor t in [0, 1] on both axes; the
+        at-rest zone itself is what update_lod checked against the budget.
+        """
+        if self.max_tiles <= 0:
+            return margin_w, margin_h
+        area = self.max_tiles / TILES_PER_AREA / 4.0   # budget as (half width * half height)
+        a0, b0 = half_w + rest_w, half_h + rest_h
+        da, db = max(0.0, margin_w - rest_w), max(0.0, margin_h - rest_h)
+        if (a0 + da) * (b0 + db) <= area:
+            return margin_w, margin_h
+        if a0 * b0 >= area:
+            return min(margin_w, rest_w), min(margin_h, rest_h)
+        # Solve (a0 + t*da) * (b0 + t*db) = area for t
+        qa, qb, qc = da * db, a0 * db + b0 * da, a0 * b0 - area
+        if qa > 1e-12:
+            t = (-qb + math.sqrt(qb * qb - 4.0 * qa * qc)) / (2.0 * qa)
+        else:
+            t = -qc / qb
+        return rest_w + t * da, rest_h + t * db
+
     # -------------------------------------------------------------------------
     # Public API: request generation (non-blocking)
     # -------------------------------------------------------------------------
 
     def request_generation(self, camera_x, camera_y, zoom, aspect, gamma,
-                           velocity_x=0.0, velocity_y=0.0):
+                           velocity_x=0.0, velocity_y=0.0, target_zoom=None):
         """
-        Request tile generation for the given viewport.
-        Runs on a background thread. Non-blocking.
-        If a worker is already running, the request is queued as pending.
-        The running worker completes normally; when done, _finish_worker
-        launches the pending request with a fresh generation ID.
+        Request tile generation for the given viewport. Non-blocking.
+        The job is queued for the persistent worker thread; if the queue is
+        full the oldest queued job is cancelled and replaced (latest wins).
+        Zones are sized for zoom's bucket, one bucket further out when
+        target_zoom (where the zoom is heading) lies beyond it.
+        Returns the queued GenerationJob.
         """
         gen_bounds, comfort_bounds = self._compute_zones(
-            camera_x, camera_y, zoom, aspect, velocity_x, velocity_y)
-
-        if self._generation_in_progress:
-            # Queue as pending — will be launched when current worker finishes.
-            # Don't increment _active_generation_id here: let the current
-            # worker finish so it can deliver its results. The pending request
-            # will get a fresh ID when _finish_worker launches it.
-            self._pending_request = (gen_bounds, comfort_bounds, gamma)
-            return
+            camera_x, camera_y, self._zone_zoom(zoom, aspect, target_zoom), aspect,
+            velocity_x, velocity_y)
+        half_h = 3.0 / zoom
+        half_w = half_h * aspect
+        view_bounds = (camera_x - half_w, camera_y - half_h,
+                       camera_x + half_w, camera_y + half_h)
 
-        self._generation_id += 1
-        self._active_generation_id = self._generation_id
-        self._launch_worker(gen_bounds, comfort_bounds, gamma, self._generation_id)
-
-    def _launch_worker(self, gen_bounds, comfort_bounds, gamma, generation_id):
-        """Start a background generation thread."""
-        self._generation_in_progress = True
-        self._worker_thread = threading.Thread(
-            target=self._generate_worker,
-            args=(gen_bounds, comfort_bounds, gamma, generation_id),
-            daemon=True
-        )
-        self._worker_thread.start()
+        self._zones_lod = self.lod_level
+
+        with self._queue_cond:
+            self._generation_id += 1
+            job = GenerationJob(gen_bounds, comfort_bounds, gamma, self._generation_id,
+                                view_bounds, (velocity_x, velocity_y))
+            while len(self._queue) >= max(1, self.queue_size):
+                self._queue.popleft().cancel()
+                self._stats['superseded'] += 1
+            self._queue.append(job)
+            self._latest_job = job
+            self._stats['requests'] += 1
+            # Foreground work always pre-empts a running prefetch
+            if isinstance(self._current_job, PrefetchJob) and not self._current_job.cancelled:
+                self._current_job.cancel()
+                self._stats['prefetch_preempted'] += 1
+            self._queue_cond.notify()
+
+        self._ensure_worker()
+        return job
+
+    def request_prefetch(self, path, zoom, aspect, gamma, velocity_x=0.0, velocity_y=0.0):
+        """
+        Queue low-priority generation of the zones around predicted camera
+        positions (path: [(x, y), ...], nearest first) into the cell cache.
+        Zones already inside the current generation zone are skipped. Runs
+        only when no foreground job is queued; a newer prefetch replaces a
+        pending one. Returns the PrefetchJob, or None if nothing to do.
+        """
+        if self.procedural_only or self.gen_bounds is None:
+            return None
+        gx0, gy0, gx1, gy1 = self.gen_bounds
+        zoom = self._zone_zoom(zoom, aspect)
+        bounds = []
+        for x, y in path:
+            zone, _comfort = self._compute_zones(x, y, zoom, aspect, velocity_x, velocity_y)
+            if zone[0] < gx0 or zone[1] < gy0 or zone[2] > gx1 or zone[3] > gy1:
+                bounds.append(zone)
+        if not bounds:
+            return None
+
+        job = PrefetchJob(bounds, gamma)
+        with self._queue_cond:
+            if self._prefetch_job is not None:
+                self._prefetch_job.cancel()
+            self._prefetch_job = job
+            self._stats['prefetch_requests'] += 1
+            self._queue_cond.notify()
+
+        self._ensure_worker()
+        return job
+
+    def is_generating(self):
+        """True while a foreground job is running or queued."""
+        with self._lock:
+            return isinstance(self._current_job, GenerationJob) or bool(self._queue)
+
+    def get_generation_stats(self):
+        """Snapshot of the generation service: queue depth, busy flag,
+        request/superseded/completed/cancelled counters and moving-average
+        latencies (ms) from request to staged geometry / patterns.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['queue_depth'] = len(self._queue)
+            stats['busy'] = isinstance(self._current_job, GenerationJob)
+            stats['prefetching'] = isinstance(self._current_job, PrefetchJob)
+        stats['expected_latency_ms'] = self.expected_latency() * 1000.0
+        return stats
+
+    def poll_chunks(self):
+        """Drain progressive Pass 1 chunks staged since the last poll.
+        Returns a list of (gpu_vertices, gpu_tile_data, keys, generation_id,
+        fresh); fresh is True when the chunk's gamma differs from the tile set
+        currently swapped in (its keys name new geometry). The chunks are for
+        display only — the complete store still arrives via poll_geometry.
+        """
+        if not self._staged_chunks:
+            return []
+
+        with self._lock:
+            staged = self._staged_chunks
+            self._staged_chunks = []
+
+        current = list(self._current_gamma)
+        return [(chunk.gpu_vertices, chunk.gpu_tile_data, chunk.keys, gen_id,
+                 list(gamma) != current)
+                for chunk, gamma, gen_id in staged]
 
     def poll_geometry(self):
         """Check if Pass 1 (geometry + GPU arrays) results are ready.
-        If so, swap in tile data and return staged GPU arrays.
-        Returns (gpu_vertices, gpu_tile_data, tile_count, generation_id) or None.
+        If so, swap in the new TileStore and return its GPU arrays.
+        Returns (gpu_vertices, gpu_tile_data, tile_count, generation_id,
+                 row_remap) or None.
+
+        row_remap maps each old tile row to its row in the new store (-1 if
+        the tile is gone); interaction columns of surviving tiles are carried
+        over. It is None when gamma changed, since keys then name new geometry.
         """
         if self._staged_geometry is None:
             return None
@@ -203,28 +660,32 @@ class TileDataManager:
             staged = self._staged_geometry
             self._staged_geometry = None
 
-        (tiles_dict, tile_list, gpu_vertices, gpu_tile_data,
-         gen_bounds, comfort_bounds, gamma, generation_id) = staged
+        (store, gen_bounds, comfort_bounds, gamma, generation_id) = staged
 
-        self.tiles = tiles_dict
-        self.tile_list = tile_list
+        old = self.store
+        row_remap = None
+        if list(gamma) == list(self._current_gamma):
+            row_remap = store.index_of(old.keys)
+            kept = row_remap >= 0
+            cols = slice(COL_SELECTED, COL_ANIM_TYPE + 1)
+            store.gpu_tile_data[row_remap[kept], cols] = old.gpu_tile_data[kept, cols]
+
+        self.store = store
         self.gen_bounds = gen_bounds
         self.comfort_bounds = comfort_bounds
-        self.tile_count = len(tile_list)
+        self.tile_count = len(store)
         self._current_gamma = gamma
-        self.gpu_vertices = gpu_vertices
-        self.gpu_tile_data = gpu_tile_data
-
-        # Build O(1) tile->index lookup
-        self._tile_index_map = {id(tile): i for i, tile in enumerate(tile_list)}
+        self.gpu_vertices = store.gpu_vertices
+        self.gpu_tile_data = store.gpu_tile_data
 
         self.logger.info(f"Geometry ready: {self.tile_count} tiles (gen_id={generation_id})")
-        return (gpu_vertices, gpu_tile_data, self.tile_count, generation_id)
+        return (self.gpu_vertices, self.gpu_tile_data, self.tile_count, generation_id,
+                row_remap)
 
     def poll_patterns(self):
         """Check if Pass 2 (pattern detection) results are ready.
         Returns (pattern_type_col, blend_factor_col, stars, bursts,
-                 symmetry_tile_ids, generation_id) or None.
+                 symmetry_indices, generation_id) or None.
         """
         if self._staged_patterns is None:
             return None
@@ -233,15 +694,11 @@ class TileDataManager:
             staged = self._staged_patterns
             self._staged_patterns = None
 
-        # Save blend map for carry-over to next generation's Pass 1
+        # Save patterns for carry-over to next generation's Pass 1
         (pattern_type_col, blend_factor_col, stars, bursts,
-         symmetry_tile_ids, gen_id) = staged
-        if self.tile_list and len(self.tile_list) == len(blend_factor_col):
-            blend_map = {}
-            for i, tile in enumerate(self.tile_list):
-                key = (tile.r, tile.s, tile.kr, tile.ks)
-                blend_map[key] = (float(blend_factor_col[i]), float(pattern_type_col[i]))
-            self._prev_blend_map = blend_map
+         symmetry_indices, gen_id) = staged
+        if self.tile_count and self.tile_count == len(blend_factor_col):
+            self._prev_patterns = (self.store.keys, pattern_type_col, blend_factor_col)
 
         return staged
 
@@ -249,481 +706,836 @@ class TileDataManager:
     # Background worker
     # -------------------------------------------------------------------------
 
-    def _finish_worker(self):
-        """Called at the end of a worker run. Launches pending request if any."""
-        self._generation_in_progress = False
-        pending = self._pending_request
-        self._pending_request = None
-        if pending is not None and not self._shutdown:
-            gen_bounds, comfort_bounds, gamma = pending
-            self._generation_id += 1
-            self._active_generation_id = self._generation_id
-            self._launch_worker(gen_bounds, comfort_bounds, gamma, self._generation_id)
-
-    def _generate_worker(self, gen_bounds, comfort_bounds, gamma, generation_id):
-        """Background thread: two-pass generation.
-        Pass 1: tiles + GPU buffer packing (geometry only, default patterns).
+    def _ensure_worker(self):
+        """Start the worker thread on first use."""
+        if self._worker_thread is None or not self._worker_thread.is_alive():
+            self._worker_thread = threading.Thread(
+                target=self._worker_loop, name='TileDataManager', daemon=True)
+            self._worker_thread.start()
+
+    def _cancel_jobs(self):
+        """Cancel the queued and running jobs (lock held)."""
+        for job in self._queue:
+            job.cancel()
+        self._queue.clear()
+        if self._prefetch_job is not None:
+            self._prefetch_job.cancel()
+            self._prefetch_job = None
+        if self._current_job is not None:
+            self._current_job.cancel()
+
+    def _worker_loop(self):
+        """Persistent worker: run queued jobs until shutdown. Foreground jobs
+        go first; a pending prefetch runs only when the queue is empty."""
+        while True:
+            with self._queue_cond:
+                while not self._queue and self._prefetch_job is None and not self._shutdown:
+                    self._queue_cond.wait()
+                if self._shutdown:
+                    return
+                if self._queue:
+                    job = self._queue.popleft()
+                else:
+                    job, self._prefetch_job = self._prefetch_job, None
+                self._current_job = job
+
+            prefetch = isinstance(job, PrefetchJob)
+            try:
+                self._sync_disk_cache()
+                if prefetch:
+                    self._prefetch_worker(job)
+                else:
+                    self._generate_worker(job)
+            except Exception as e:
+                self.logger.error(f"Tile generation failed: {e}", exc_info=True)
+                job.cancel()   # its zones never land; let the next frame re-request
+            finally:
+                with self._lock:
+                    self._current_job = None
+                    if not prefetch:
+                        self._stats['cancelled' if job.cancelled else 'completed'] += 1
+
+    def _prefetch_worker(self, job):
+        """Generate the missing cells of each predicted zone into the cell
+        cache, nearest zone first, stopping as soon as the job is pre-empted."""
+        if self.cell_size != self._cell_cache_size:
+            return   # the next foreground job re-cuts the cache
+        gamma_key = tuple(float(g) for g in job.gamma)
+        tried_blocks = set()
+        new_cells = 0
+        for bounds in job.bounds:
+            cx0, cy0, cx1, cy1 = self._cell_range(bounds)
+            cells = [(cx, cy) for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)]
+            if self._disk_cache is not None:
+                self._load_disk_cells(cells, gamma_key, tried_blocks)
+            rects = self._missing_rects(cells, gamma_key)
+            new_cells += self._generate_rects(rects, job.gamma, gamma_key, job)
+            if job.cancelled:
+                break
+        self._evict_cells()
+        with self._lock:
+            self._stats['prefetch_cells'] += new_cells
+        if new_cells:
+            self.logger.debug(f"Prefetch: {new_cells} cells ahead of the camera"
+                              f"{' (pre-empted)' if job.cancelled else ''}")
+
+    def _record_latency(self, key, job):
+        """Fold request -> now latency into a moving average (lock held)."""
+        ms = (time.perf_counter() - job.requested_at) * 1000.0
+        prev = self._stats[key]
+        self._stats[key] = ms if prev == 0.0 else prev * 0.8 + ms * 0.2
+
+    def _generate_worker(self, job):
+        """Run one job as two passes.
+        Pass 1: tiles + GPU buffer packing (geometry only, default patterns),
+                staged chunk by chunk (viewport first) and then as a whole.
         Pass 2: neighbors + patterns -> pattern patch columns.
         """
-        try:
-            t0 = time.perf_counter()
-
-            # Check if gamma changed — invalidate tile cache
-            gamma_tuple = tuple(round(g, 6) for g in gamma)
-            if self._cache_gamma != gamma_tuple:
-                self._tile_cache = {}
-                self._cache_gamma = gamma_tuple
-
-            tiles_dict = self._generate_tiles(gen_bounds, gamma, generation_id)
-            tile_list = list(tiles_dict.values())
-            t1 = time.perf_counter()
-
-            # Pack GPU arrays with default pattern values (runs on background thread)
-            gpu_vertices, gpu_tile_data = self._pack_gpu_buffers_staged(tile_list, gamma)
-            t2 = time.perf_counter()
+        gamma = job.gamma
+        set_key = self._tileset_key(job)
+        if self._stage_cached_tileset(set_key, job):
+            return
 
-            # Check for interruption before posting Pass 1
-            if self._shutdown or generation_id != self._active_generation_id:
-                self._finish_worker()
+        t0 = time.perf_counter()
+        pack_time = 0.0
+        chunks = []
+        staged = 0
+
+        def stage_chunk(chunk):
+            # Pack GPU arrays with default pattern values (runs on background
+            # thread) and hand the chunk to the renderer straight away
+            nonlocal pack_time, staged
+            tp = time.perf_counter()
+            self._pack_gpu_buffers_staged(chunk, gamma)
+            pack_time += time.perf_counter() - tp
+            chunks.append(chunk)
+            if job.cancelled or len(chunk) == 0 or self.progressive_chunks <= 1:
                 return
-
             with self._lock:
-                self._staged_geometry = (
-                    tiles_dict, tile_list, gpu_vertices, gpu_tile_data,
-                    gen_bounds, comfort_bounds, gamma, generation_id
-                )
-
-            self.logger.debug(
-                f"Pass 1: {len(tile_list)} tiles in {(t1-t0)*1000:.1f}ms, "
-                f"pack {(t2-t1)*1000:.1f}ms"
-            )
+                if staged == 0:
+                    self._record_latency('first_chunk_latency_ms', job)
+                self._staged_chunks.append((chunk, gamma, job.generation_id))
+                self._stats['chunks'] += 1
+            staged += 1
 
-            # --- Pass 2: Neighbors + pattern detection ---
-            if generation_id != self._active_generation_id:
-                self._finish_worker()
-                return
+        store = self._generate_zone(job.gen_bounds, gamma, job, stage_chunk)
 
-            self._calculate_neighbors(tile_list)
-            t3 = time.perf_counter()
+        # Check for cancellation before posting Pass 1
+        if job.cancelled:
+            return
 
-            if generation_id != self._active_generation_id:
-                self._finish_worker()
-                return
+        # The store is the chunks in order: reuse their packed buffers
+        if chunks:
+            store.gpu_vertices = np.concatenate([c.gpu_vertices for c in chunks])
+            store.gpu_tile_data = np.concatenate([c.gpu_tile_data for c in chunks])
+        store.build_query_cache()  # spatial query data, off the render thread
+        t2 = time.perf_counter()
+        t1 = t2 - pack_time
 
-            stars, bursts, symmetry_tile_ids = self._detect_patterns(tile_list)
-            t4 = time.perf_counter()
+        with self._lock:
+            self._staged_geometry = (
+                store, job.gen_bounds, job.comfort_bounds, gamma, job.generation_id
+            )
+            self._record_latency('geometry_latency_ms', job)
 
-            # Build pattern patch: the two columns that changed
-            n = len(tile_list)
-            pattern_type_col = np.array([t.pattern_type for t in tile_list], dtype=np.float32)
-            blend_factor_col = np.array([t.blend_factor for t in tile_list], dtype=np.float32)
+        self.logger.debug(
+            f"Pass 1: {len(store)} tiles in {(t1-t0)*1000:.1f}ms, "
+            f"pack {(t2-t1)*1000:.1f}ms"
+        )
 
-            # Check for interruption before posting Pass 2
-            if self._shutdown or generation_id != self._active_generation_id:
-                self._finish_worker()
-                return
+        # --- Pass 2: Neighbors + pattern detection ---
+        if self.analytic_patterns:
+            dart_count = self._analytic_neighbors(store, gamma)
+        else:
+            self._calculate_neighbors(store)
+            dart_count = None
+        t3 = time.perf_counter()
 
-            with self._lock:
-                self._staged_patterns = (
-                    pattern_type_col, blend_factor_col, stars, bursts,
-                    symmetry_tile_ids, generation_id
-                )
+        if job.cancelled:
+            return
 
-            # Update tile cache
-            self._tile_cache = tiles_dict
+        (stars, bursts, symmetry_indices,
+         pattern_type_col, blend_factor_col) = self._detect_patterns(store, dart_count)
+        t4 = time.perf_counter()
 
-            self.logger.debug(
-                f"Pass 2: neighbors {(t3-t2)*1000:.1f}ms, "
-                f"patterns {(t4-t3)*1000:.1f}ms"
+        # Check for cancellation before posting Pass 2
+        if job.cancelled:
+            return
+
+        with self._lock:
+            self._staged_patterns = (
+                pattern_type_col, blend_factor_col, stars, bursts,
+                symmetry_indices, job.generation_id
             )
+            self._record_latency('patterns_latency_ms', job)
 
-            self._finish_worker()
+        self._remember_tileset(set_key, store, pattern_type_col, blend_factor_col,
+                               stars, bursts, symmetry_indices)
+        self._save_disk_cells(store, gamma, pattern_type_col, blend_factor_col)
 
-        except Exception as e:
-            self.logger.error(f"Tile generation failed: {e}", exc_info=True)
-            self._finish_worker()
+        self.logger.debug(
+            f"Pass 2: neighbors {(t3-t2)*1000:.1f}ms, "
+            f"patterns {(t4-t3)*1000:.1f}ms"
+        )
 
     # -------------------------------------------------------------------------
-    # Tile generation (pentagrid math)
+    # Tile-set cache (complete generations)
     # -------------------------------------------------------------------------
 
-    def _generate_tiles(self, gen_bounds, gamma, generation_id=None):
-        """Generate OverlayTile objects covering the generation zone (vectorized).
-
-        For each (r, s) direction pair, all (kr, ks) grid intersections are
-        computed in bulk using NumPy, then bounds-checked with vectorized ops.
-        Only the surviving tiles are constructed as OverlayTile objects.
-        """
-        min_x, min_y, max_x, max_y = gen_bounds
-
-        # Precompute zeta as numpy complex128 array
-        zeta = np.array(self.zeta, dtype=np.complex128)      # (5,)
-        gamma_arr = np.array(gamma, dtype=np.float64)         # (5,)
+    def _tileset_key(self, job):
+        """Rounded gamma, the zone's cell set and everything Pass 2 depends on."""
+        return (tuple(round(float(g), 6) for g in job.gamma),
+                self.cell_size, self._cell_range(job.gen_bounds),
+                self.analytic_patterns, self.blend_passes, self.blend_self_weight)
+
+    def _stage_cached_tileset(self, set_key, job):
+        """Stage both passes from a cached tile set. Returns False on a miss."""
+        entry = self._tileset_cache.get(set_key)
+        if entry is None or job.cancelled:
+            return False
+        self._tileset_cache.move_to_end(set_key)
+        cached, stars, bursts, symmetry_indices, _nbytes = entry
+
+        # The swapped-in store's data buffer receives interaction writes;
+        # give it its own copy so the cached one stays clean
+        store = copy.copy(cached)
+        store.gpu_tile_data = cached.gpu_tile_data.copy()
 
-        # shift_offset for ribbon -> camera conversion
-        shift_offset = np.sum(zeta * gamma_arr)
-        inv_2_5 = 1.0 / 2.5
-
-        # Precompute zeta reciprocals for the k-vector floor computation
-        # k[d] = ceil(Re(z0 / zeta[d]) + gamma[d])  (the 0 - -x // 1 trick)
-        zeta_inv = 1.0 / zeta  # (5,) complex
+        with self._lock:
+            self._staged_geometry = (
+                store, job.gen_bounds, job.comfort_bounds, job.gamma, job.generation_id
+            )
+            self._staged_patterns = (
+                cached.pattern_type.copy(), cached.blend_factor.copy(), stars, bursts,
+                symmetry_indices, job.generation_id
+            )
+            self._record_latency('geometry_latency_ms', job)
+            self._record_latency('patterns_latency_ms', job)
+            self._stats['tileset_hits'] += 1
+        self.logger.debug(f"Tile set cache hit: {len(store)} tiles")
+        return True
+
+    def _remember_tileset(self, set_key, store, pattern_type_col, blend_factor_col,
+                          stars, bursts, symmetry_indices):
+        """Cache a finished generation (clean interaction columns) and evict
+        least-recently-used sets beyond the budget."""
+        cached = copy.copy(store)
+        cached.gpu_tile_data = store.gpu_tile_data.copy()
+        cached.gpu_tile_data[:, COL_PATTERN_TYPE] = pattern_type_col
+        cached.gpu_tile_data[:, COL_BLEND_FACTOR] = blend_factor_col
+        cached.gpu_tile_data[:, COL_SELECTED:COL_ANIM_TYPE + 1] = 0.0
+        nbytes = cached.nbytes
+        if nbytes > self.tileset_cache_budget:
+            return
 
-        # Viewport center and search radius
-        cx = (min_x + max_x) * 0.5
-        cy = (min_y + max_y) * 0.5
-        hw = (max_x - min_x) * 0.5
-        hh = (max_y - min_y) * 0.5
-        viewport_radius = max(hw, hh)
+        old = self._tileset_cache.pop(set_key, None)
+        if old is not None:
+            self._tileset_cache_bytes -= old[4]
+        self._tileset_cache[set_key] = (cached, stars, bursts, symmetry_indices, nbytes)
+        self._tileset_cache_bytes += nbytes
+        while self._tileset_cache_bytes > self.tileset_cache_budget:
+            _, evicted = self._tileset_cache.popitem(last=False)
+            self._tileset_cache_bytes -= evicted[4]
 
-        # Center indices for each pentagrid direction
-        thetas = 2.0 * math.pi * np.arange(5) / 5.0
-        center_indices = cx * np.cos(thetas) + cy * np.sin(thetas) + gamma_arr
-        search_radius = int(viewport_radius * 2.5) + 3
+    # -------------------------------------------------------------------------
+    # World-cell streaming cache
+    # -------------------------------------------------------------------------
 
-        # The 4 vertex corner offsets for each rhombus: (dkr, dks)
-        corner_offsets = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float64)  # (4, 2)
+    def _cell_range(self, bounds):
+        """Inclusive (cx0, cy0, cx1, cy1) range of cells overlapping bounds."""
+        size = self.cell_size
+        min_x, min_y, max_x, max_y = bounds
+        return (math.floor(min_x / size), math.floor(min_y / size),
+                math.floor(max_x / size), math.floor(max_y / size))
+
+    def _generate_zone(self, gen_bounds, gamma, job=None, on_chunk=None):
+        """Assemble a TileStore for every cell overlapping gen_bounds.
+
+        Cached cells are reused as-is; missing cells are generated in as few
+        rectangles as possible (runs of new cells per row, merged across rows
+        with the same span) and then split by tile centroid. Neighbors and
+        patterns are computed afterwards over the assembled store, which is
+        what stitches tiles across cell seams.
+
+        Cells are processed in the chunks given by _chunk_cells; on_chunk is
+        called with each chunk's TileStore as soon as it is assembled, and the
+        returned store is the chunks concatenated in order.
+        """
+        gamma_key = tuple(float(g) for g in gamma)
+        size = self.cell_size
+        cell_range = self._cell_range(gen_bounds)
+
+        cache = self._cell_cache
+        if size != self._cell_cache_size:
+            self._clear_cell_cache()
+            self._cell_cache_size = size
+
+        def cancelled():
+            return job is not None and job.cancelled
+
+        new_cells = 0
+        rect_count = 0
+        parts = []
+        layout = []   # (cx, cy, tile count) per cell, in store order
+        tried_blocks = set()
+        for cells in self._chunk_cells(cell_range, job):
+            if self._disk_cache is not None:
+                self._load_disk_cells(cells, gamma_key, tried_blocks)
+            rects = self._missing_rects(cells, gamma_key)
+            rect_count += len(rects)
+            new_cells += self._generate_rects(rects, gamma, gamma_key, job)
+            if cancelled():
+                # Partial result: the finished chunks are cached, the rest is not
+                return TileStore.empty()
+
+            chunk_parts = []
+            seeds = []
+            for cx, cy in cells:
+                key = (gamma_key, cx, cy)
+                cell = cache[key]
+                cache.move_to_end(key)
+                n = len(cell[0])
+                layout.append((cx, cy, n))
+                if n:
+                    chunk_parts.append(cell)
+                    seeds.append(self._pattern_seeds.get(key))
+            if on_chunk is not None:
+                chunk = TileStore.concatenate(chunk_parts)
+                if any(seed is not None for seed in seeds):
+                    unknown = np.full(2, np.nan, dtype=np.float32)
+                    chunk.seed_patterns = tuple(
+                        np.concatenate([
+                            seed[c] if seed is not None else np.broadcast_to(unknown[c], len(part[0]))
+                            for seed, part in zip(seeds, chunk_parts)])
+                        for c in range(2))
+                on_chunk(chunk)
+            parts.extend(chunk_parts)
+        self._evict_cells()
+
+        cx0, cy0, cx1, cy1 = cell_range
+        total = (cx1 - cx0 + 1) * (cy1 - cy0 + 1)
+        self.logger.debug(f"Zone: {total} cells, {new_cells} generated "
+                          f"in {rect_count} rects, cache {len(cache)} cells "
+                          f"({self._cell_cache_bytes / 1048576:.1f} MB)")
+        store = TileStore.concatenate(parts)
+        # Every cell's tiles are one contiguous run of rows, so the spatial
+        # index comes straight from the cell layout (no re-bucketing)
+        store.set_cell_index(size, cell_range, layout)
+        return store
+
+    def _chunk_cells(self, cell_range, job):
+        """Split a zone's cells into delivery chunks: the cells under the
+        viewport first, then progressive_chunks - 1 rectangular rings growing
+        out to the zone edge. Sides facing the motion grow twice as fast, so
+        the runway ahead arrives first. Rings stay rectangular so each one is
+        generated in at most four rectangles.
+        """
+        cx0, cy0, cx1, cy1 = cell_range
+        rings = self.progressive_chunks - 1
+        view = None if job is None else job.view_bounds
+        if rings < 1 or view is None:
+            return [[(cx, cy) for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)]]
+
+        vx0, vy0, vx1, vy1 = self._cell_range(view)
+        inner = (max(cx0, min(vx0, cx1)), max(cy0, min(vy0, cy1)),
+                 max(cx0, min(vx1, cx1)), max(cy0, min(vy1, cy1)))
+        vel_x, vel_y = job.velocity
+        # Growth rate per side (x0, y0, x1, y1): 2 when moving towards it
+        rates = (2.0 if vel_x < 0 else 1.0, 2.0 if vel_y < 0 else 1.0,
+                 2.0 if vel_x > 0 else 1.0, 2.0 if vel_y > 0 else 1.0)
+
+        chunks = []
+        prev = None
+        for ring in range(rings + 1):
+            frac = ring / rings
+            rect = tuple(
+                a + int(round((b - a) * min(1.0, frac * rate)))
+                for a, b, rate in zip(inner, cell_range, rates))
+            x0, y0, x1, y1 = rect
+            cells = [(cx, cy) for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1)
+                     if prev is None or not (prev[0] <= cx <= prev[2] and prev[1] <= cy <= prev[3])]
+            if cells:
+                chunks.append(cells)
+            prev = rect
+        return chunks
+
+    def _missing_rects(self, cells, gamma_key):
+        """Cover the uncached cells among cells with rectangles (x0, y0, x1, y1),
+        inclusive cell units: runs of missing cells per row, merged across
+        rows with the same span."""
+        rows = {}
+        for cx, cy in cells:
+            if (gamma_key, cx, cy) not in self._cell_cache:
+                rows.setdefault(cy, []).append(cx)
+        if not rows:
+            return []
+
+        # Find missing cells as runs per row: (cy) -> [(run_x0, run_x1), ...]
+        missing_runs = {}
+        for cy, xs in rows.items():
+            runs = []
+            for cx in sorted(xs):
+                if runs and runs[-1][1] == cx - 1:
+                    runs[-1][1] = cx
+                else:
+                    runs.append([cx, cx])
+            missing_runs[cy] = [tuple(run) for run in runs]
+
+        # Merge vertically adjacent rows with identical runs into rectangles
+        rects = []
+        open_rects = {}
+        for cy in range(min(rows), max(rows) + 2):
+            runs = set(missing_runs.get(cy, ()))
+            for run in list(open_rects):
+                if run not in runs:
+                    rects.append((run[0], open_rects.pop(run), run[1], cy - 1))
+            for run in runs:
+                open_rects.setdefault(run, cy)
+        return rects
+
+    def _rect_bounds(self, rect):
+        """Generation bounds for a rectangle of cells (x0, y0, x1, y1)."""
+        size = self.cell_size
+        # Tiles reach at most one edge length (0.4) past their centroid
+        pad = 0.4
+        x0, y0, x1, y1 = rect
+        return (x0 * size - pad, y0 * size - pad,
+                (x1 + 1) * size + pad, (y1 + 1) * size + pad)
+
+    def _generate_rects(self, rects, gamma, gamma_key, job):
+        """Generate and cache the cells of each rectangle (on the process pool
+        when one is running). Returns the number of cells stored."""
+        rect_bounds = self._rect_bounds
+
+        def cancelled():
+            return job is not None and job.cancelled
+
+        new_cells = 0
+        pool = self._process_pool
+        if pool is not None and rects:
+            # Split rectangles into row bands so every process gets work
+            jobs = []
+            for x0, y0, x1, y1 in rects:
+                rows = y1 - y0 + 1
+                bands = min(rows, pool.workers)
+                for b in range(bands):
+                    by0 = y0 + rows * b // bands
+                    by1 = y0 + rows * (b + 1) // bands - 1
+                    jobs.append((rect_bounds((x0, by0, x1, by1)), (x0, by0, x1, by1)))
+
+            def consume(store, rect):
+                nonlocal new_cells
+                new_cells += self._store_cells(store, gamma, gamma_key, *rect)
+
+            pool.generate(jobs, gamma, consume, cancelled)
+        else:
+            for rect in rects:
+                store = self._generate_tiles(rect_bounds(rect), gamma, job)
+                if cancelled():
+                    # Partial result: don't let it into the cache
+                    break
+                new_cells += self._store_cells(store, gamma, gamma_key, *rect)
+        return new_cells
+
+    def _store_cells(self, store, gamma, gamma_key, x0, y0, x1, y1):
+        """Split a generated rectangle into cells by tile centroid and cache
+        them (empty cells included, so they are not generated again).
+        Returns the number of cells stored.
+        """
+        size = self.cell_size
+        shift_offset = sum(z * g for z, g in zip(self.zeta, gamma))
+        cam = (store.centroids() - shift_offset) * (1.0 / 2.5)
+        tile_cx = np.floor(cam.real / size).astype(np.int64)
+        tile_cy = np.floor(cam.imag / size).astype(np.int64)
+
+        inside = (tile_cx >= x0) & (tile_cx <= x1) & (tile_cy >= y0) & (tile_cy <= y1)
+        rows = np.flatnonzero(inside)
+        width = x1 - x0 + 1
+        cell_of = (tile_cy[rows] - y0) * width + (tile_cx[rows] - x0)
+        order = rows[np.argsort(cell_of, kind='stable')]
+        bounds = np.searchsorted(np.sort(cell_of), np.arange(width * (y1 - y0 + 2)))
+
+        count = 0
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                c = (cy - y0) * width + (cx - x0)
+                sel = order[bounds[c]:bounds[c + 1]]
+                cell = (store.r[sel], store.s[sel], store.k[sel])
+                self._cell_cache[(gamma_key, cx, cy)] = cell
+                if self._disk_cache is not None:
+                    self._unsaved_cells.add((gamma_key, cx, cy))
+                self._cell_cache_bytes += sum(a.nbytes for a in cell)
+                count += 1
+        return count
+
+    def _evict_cells(self):
+        """Drop least-recently-used cells until the cache fits its budget."""
+        cache = self._cell_cache
+        while cache and self._cell_cache_bytes > self.cell_cache_budget:
+            key, cell = cache.popitem(last=False)
+            self._cell_cache_bytes -= sum(a.nbytes for a in cell)
+            self._pattern_seeds.pop(key, None)
+            self._unsaved_cells.discard(key)
+
+    def _clear_cell_cache(self):
+        self._cell_cache.clear()
+        self._cell_cache_bytes = 0
+        self._pattern_seeds.clear()
+        self._unsaved_cells.clear()
+
+    def _load_disk_cells(self, cells, gamma_key, tried_blocks):
+        """Pull cells missing from memory in from the disk cache, one block
+        file at a time (each block is read at most once per zone)."""
+        disk = self._disk_cache
+        for cx, cy in cells:
+            if (gamma_key, cx, cy) in self._cell_cache:
+                continue
+            block = disk.block_of(cx, cy)
+            if block in tried_blocks:
+                continue
+            tried_blocks.add(block)
+            for (bx, by), (r, s, k, pattern_type, blend_factor) in disk.load_block(
+                    gamma_key, self.cell_size, cx, cy).items():
+                key = (gamma_key, bx, by)
+                if key in self._cell_cache:
+                    continue
+                self._cell_cache[key] = (r, s, k)
+                self._cell_cache_bytes += r.nbytes + s.nbytes + k.nbytes
+                self._pattern_seeds[key] = (pattern_type, blend_factor)
+
+    def _save_disk_cells(self, store, gamma, pattern_type_col, blend_factor_col):
+        """Write this session's new cells of a finished store to disk, with
+        their final pattern columns."""
+        disk = self._disk_cache
+        if disk is None or not self._unsaved_cells or store.cell_layout is None:
+            return
+        gamma_key = tuple(float(g) for g in gamma)
+        cells = {}
+        start = 0
+        for cx, cy, n in store.cell_layout:
+            key = (gamma_key, cx, cy)
+            if key in self._unsaved_cells:
+                rows = slice(start, start + n)
+                cells[(cx, cy)] = (store.r[rows], store.s[rows], store.k[rows],
+                                   pattern_type_col[rows], blend_factor_col[rows])
+                self._unsaved_cells.discard(key)
+            start += n
+        if cells:
+            disk.save_cells(gamma_key, store.cell_size, cells)
 
-        tiles_dict = {}
+    # -------------------------------------------------------------------------
+    # Tile generation (pentagrid math)
+    # -------------------------------------------------------------------------
 
-        for r in range(5):
-            kr_center = int(round(center_indices[r]))
-            zeta_r = zeta[r]
-            for s in range(r + 1, 5):
-                if self._shutdown or (generation_id is not None
-                                      and generation_id != self._active_generation_id):
-                    return tiles_dict
-
-                ks_center = int(round(center_indices[s]))
-                zeta_s = zeta[s]
-                denom = zeta[s - r].imag  # scalar
-
-                # Build all (kr, ks) pairs for this (r, s) as arrays
-                kr_range = np.arange(kr_center - search_radius, kr_center + search_radius + 1, dtype=np.float64)
-                ks_range = np.arange(ks_center - search_radius, ks_center + search_radius + 1, dtype=np.float64)
-                KR, KS = np.meshgrid(kr_range, ks_range, indexing='ij')
-                kr_flat = KR.ravel()  # (M,)
-                ks_flat = KS.ravel()  # (M,)
-                M = len(kr_flat)
-
-                # ---- Vectorized z0 computation ----
-                # z0 = 1j * (zeta[r] * (ks - gamma[s]) - zeta[s] * (kr - gamma[r])) / denom
-                z0 = 1j * (zeta_r * (ks_flat - gamma_arr[s]) - zeta_s * (kr_flat - gamma_arr[r])) / denom
-                z0 = np.round(z0.real, 5) + 1j * np.round(z0.imag, 5)  # (M,) complex
-
-                # ---- Vectorized k-vector: k[d] = ceil(Re(z0 / zeta[d]) + gamma[d]) ----
-                # z0[:, None] / zeta[None, :] -> (M, 5)
-                z0_over_zeta = z0[:, None] * zeta_inv[None, :]  # (M, 5) complex
-                k_base = np.floor(z0_over_zeta.real + gamma_arr[None, :]).astype(np.float64)
-                # The original uses: 0 - -(Re(z0/t) + p) // 1  which equals ceil(...) for non-integer
-                # np.floor gives the //1 part; 0 - -x//1 = -(-x//1) = ceil(x) for non-integers
-                k_base = -np.floor(-(z0_over_zeta.real + gamma_arr[None, :]))  # (M, 5)
-
-                # ---- Vectorized 4 vertices per tile ----
-                # For each corner (dkr, dks), set k[r] = kr + dkr, k[s] = ks + dks
-                # vertex = sum(k[d] * zeta[d] for d in range(5))
-                # = sum(k_base[d] * zeta[d]) + dkr * zeta[r] + dks * zeta[s]  (since only k[r],k[s] change)
-                #
-                # base_vertex = sum over d of k_base[d] * zeta[d]
-                # but k_base[r] and k_base[s] are overwritten by kr, ks in the original code
-                # So: vertex = sum_{d != r,s}(k_base[d] * zeta[d]) + (kr+dkr)*zeta[r] + (ks+dks)*zeta[s]
-
-                # Sum over non-(r,s) directions
-                mask = np.ones(5, dtype=bool)
-                mask[r] = False
-                mask[s] = False
-                # base_sum = sum of k_base[d] * zeta[d] for d not in {r, s}
-                base_sum = np.sum(k_base[:, mask] * zeta[None, mask], axis=1)  # (M,) complex
-
-                # 4 vertices: shape (M, 4) complex
-                all_verts = np.empty((M, 4), dtype=np.complex128)
-                for ci, (dkr, dks) in enumerate(corner_offsets):
-                    all_verts[:, ci] = base_sum + (kr_flat + dkr) * zeta_r + (ks_flat + dks) * zeta_s
-                # Round to 5 decimals
-                all_verts = np.round(all_verts.real, 5) + 1j * np.round(all_verts.imag, 5)
-
-                # ---- Vectorized bounds check in camera space ----
-                # p_cam = (ribbon - shift_offset) / 2.5
-                cam_verts = (all_verts - shift_offset) * inv_2_5  # (M, 4) complex
-                cam_x = cam_verts.real  # (M, 4)
-                cam_y = cam_verts.imag  # (M, 4)
-
-                # Tile is in bounds if ANY of its 4 vertices is inside gen_bounds
-                in_x = (cam_x >= min_x) & (cam_x <= max_x)  # (M, 4) bool
-                in_y = (cam_y >= min_y) & (cam_y <= max_y)
-                in_bounds = np.any(in_x & in_y, axis=1)  # (M,) bool
-
-                # ---- Create OverlayTile objects only for visible tiles ----
-                # Reuse cached tiles when gamma hasn't changed (vertices are identical)
-                cache = self._tile_cache
-                indices = np.nonzero(in_bounds)[0]
-                for idx in indices:
-                    ki = int(kr_flat[idx])
-                    ksi = int(ks_flat[idx])
-                    key = (r, s, ki, ksi)
-                    if key not in tiles_dict:
-                        cached = cache.get(key)
-                        if cached is not None:
-                            tiles_dict[key] = cached
-                        else:
-                            v = all_verts[idx]
-                            tile_verts = [v[0], v[1], v[2], v[3]]
-                            tiles_dict[key] = OverlayTile(tile_verts, r, s, ki, ksi)
-
-        return tiles_dict
+    def _generate_tiles(self, gen_bounds, gamma, job=None):
+        """Generate a TileStore covering the generation zone (see
+        TileStore.generate_tiles), polling job for cancellation."""
+        cancelled = None if job is None else (lambda: job.cancelled)
+        return generate_tiles(gen_bounds, gamma, self.exact_index_ranges, cancelled)
 
     # -------------------------------------------------------------------------
     # Neighbor calculation (edge hashing)
     # -------------------------------------------------------------------------
 
-    def _calculate_neighbors(self, tile_list):
-        """Build neighbor graph using edge hashing. O(N) where N = number of tiles.
+    def _calculate_neighbors(self, store):
+        """Build the neighbor graph from exact lattice edge keys. O(N log N).
 
-        Uses raw vertex values (already rounded to 5dp from generation) as edge
-        keys, avoiding the overhead of normalized_edge() / edges() method calls.
+        All 4N edges are packed as int64 (lower endpoint, direction) keys,
+        sorted, and edges shared by exactly two tiles become a pair of CSR
+        entries (store.neighbor_indptr / store.neighbor_indices).
         """
-        edge_map = {}  # (v_lo, v_hi) -> [tile, ...]
-
-        for tile in tile_list:
-            tile.neighbors = []  # reset
-            verts = tile.vertices
-            n = len(verts)
-            for i in range(n):
-                v1 = verts[i]
-                v2 = verts[(i + 1) % n]
-                # Sort by (real, imag) to normalize edge direction
-                if (v1.real, v1.imag) < (v2.real, v2.imag):
-                    edge_key = (v1, v2)
-                else:
-                    edge_key = (v2, v1)
-                bucket = edge_map.get(edge_key)
-                if bucket is None:
-                    edge_map[edge_key] = [tile]
-                else:
-                    bucket.append(tile)
+        n = len(store)
+        if n == 0:
+            store.neighbor_indptr = np.zeros(1, dtype=np.int64)
+            store.neighbor_indices = np.zeros(0, dtype=np.int32)
+            return
+
+        # Exact lattice edge keys: (lower endpoint, direction) packed in int64
+        edge_keys = store.edge_keys().ravel()
+
+        order = np.argsort(edge_keys, kind='stable')
+        sorted_keys = edge_keys[order]
+
+        # Runs of equal keys: keep only edges shared by exactly two tiles
+        run_start = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        run_len = np.diff(np.r_[run_start, len(sorted_keys)])
+        pairs = run_start[run_len == 2]
+        t0 = order[pairs] >> 2
+        t1 = order[pairs + 1] >> 2
+
+        # Symmetric CSR adjacency
+        src = np.concatenate([t0, t1])
+        dst = np.concatenate([t1, t0])
+        by_src = np.argsort(src, kind='stable')
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        store.neighbor_indptr = indptr
+        store.neighbor_indices = dst[by_src].astype(np.int32)
+
+    def _analytic_neighbors(self, store, gamma):
+        """Neighbor graph straight from the pentagrid, without edge hashing.
+
+        Tile (r, s, kr, ks) sits at the crossing z0 of grid lines L_r(kr) and
+        L_s(ks), where L_d(m) = {z : Re(z * conj(zeta[d])) + gamma[d] = m}.
+        Consecutive crossings along a grid line are tiles sharing an edge, so
+        the 4 neighbors are the nearest crossings in both directions along
+        both lines. Their pentagrid keys (and kite/dart type) follow from
+        which family d is crossed and at which integer m; only the presence
+        check against the store needs a lookup.
+
+        Sets store.neighbor_indptr / neighbor_indices and returns the
+        per-tile count of thin (dart) neighbors present in the store.
+        """
+        n = len(store)
+        if n == 0:
+            store.neighbor_indptr = np.zeros(1, dtype=np.int64)
+            store.neighbor_indices = np.zeros(0, dtype=np.int32)
+            return np.zeros(0)
 
-        # Link tiles sharing an edge (direct list append, skip add_neighbor dedup)
-        for tiles_on_edge in edge_map.values():
-            if len(tiles_on_edge) == 2:
-                t0, t1 = tiles_on_edge
-                t0.neighbors.append(t1)
-                t1.neighbors.append(t0)
+        zeta = np.array(self.zeta, dtype=np.complex128)
+        gamma_arr = np.array(gamma, dtype=np.float64)
+
+        # rate[a, d]: change of f_d per unit step along i * zeta[a]
+        fam = np.arange(5)
+        rate_table = np.sin(2.0 * math.pi * (fam[None, :] - fam[:, None]) / 5.0)
+
+        nb_keys = np.empty((n, 4), dtype=np.int64)
+        nb_thin = np.empty((n, 4), dtype=bool)
+        pair = store.r.astype(np.int64) * 5 + store.s
+        for r in range(5):
+            for s in range(r + 1, 5):
+                rows = np.flatnonzero(pair == r * 5 + s)
+                if len(rows) == 0:
+                    continue
+                kr = store.kr[rows].astype(np.float64)
+                ks = store.ks[rows].astype(np.float64)
+
+                # Grid-line crossing (same formula as _generate_tiles, unrounded)
+                denom = zeta[s - r].imag
+                z0 = 1j * (zeta[r] * (ks - gamma_arr[s]) - zeta[s] * (kr - gamma_arr[r])) / denom
+                # f[:, d] = grid coordinate of z0 in family d
+                f = (z0[:, None] * np.conj(zeta)[None, :]).real + gamma_arr[None, :]
+                f_floor = np.floor(f)
+                f_ceil = np.ceil(f)
+
+                for line, (a, b, ka, kb) in enumerate(((r, s, kr, ks), (s, r, ks, kr))):
+                    rate = rate_table[a]
+                    for step in (1, -1):
+                        ahead = (rate > 0) if step > 0 else (rate < 0)
+                        m = np.where(ahead, f_floor + 1.0, f_ceil - 1.0)
+                        # The other line through z0 is crossed exactly at kb +- 1
+                        m[:, b] = kb + np.sign(rate[b]) * step
+                        with np.errstate(divide='ignore', invalid='ignore'):
+                            t = (m - f) / rate   # column a is overwritten below
+                        t[:, b] = step / abs(rate[b])
+                        t[:, a] = np.inf * step
+                        d = np.argmin(t, axis=1) if step > 0 else np.argmax(t, axis=1)
+                        kd = m[np.arange(len(rows)), d]
+
+                        lo = np.minimum(a, d)
+                        hi = np.maximum(a, d)
+                        k_lo = np.where(a < d, ka, kd)
+                        k_hi = np.where(a < d, kd, ka)
+                        col = line * 2 + (0 if step > 0 else 1)
+                        nb_keys[rows, col] = pack_keys(lo, hi, k_lo, k_hi)
+                        diff = hi - lo
+                        nb_thin[rows, col] = (diff == 2) | (diff == 3)
+
+        nb_idx = store.index_of(nb_keys)
+        present = nb_idx >= 0
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(present.sum(axis=1), out=indptr[1:])
+        store.neighbor_indptr = indptr
+        store.neighbor_indices = nb_idx[present].astype(np.int32)
+        return (present & nb_thin).sum(axis=1)
 
     # -------------------------------------------------------------------------
     # Pattern detection with spatial vertex index
     # -------------------------------------------------------------------------
 
-    def _detect_patterns(self, tile_list):
+    def _detect_patterns(self, store, dart_count=None):
         """
-        Detect star and starburst patterns via single-pass vertex index scan.
+        Detect star and starburst patterns by counting valid tiles per vertex.
 
-        Instead of iterating tiles and searching neighbors for common vertices,
-        we build a vertex index and scan it directly.  Each vertex maps to all
-        tiles sharing it, so pattern detection is just a count + filter:
+        All 4N corners map to exact lattice vertex ids, counted with bincount,
+        so pattern detection is just a count + filter:
           - Star:      exactly 5 valid kites at one vertex
           - Starburst: exactly 10 valid darts at one vertex
 
-        Complexity: O(N) for validity + O(V) for vertex scan, where V ~ 2N.
+        Complexity: O(N log N) for the vertex sort, everything else O(N).
+        dart_count (per-tile thin-neighbor count) is taken from the CSR graph
+        unless supplied, as _analytic_neighbors does.
+
+        Returns (stars, bursts, symmetry_indices, pattern_type_col, blend_factor_col).
         """
-        # ---- Build vertex index using NumPy-rounded keys ----
-        # Bulk-extract all vertices into a flat array, round with NumPy,
-        # then scatter back into a dict keyed by (rounded_real, rounded_imag).
-        n = len(tile_list)
-        all_verts_flat = np.empty(n * 4, dtype=np.complex128)
-        for i, tile in enumerate(tile_list):
-            verts = tile.vertices
-            all_verts_flat[i * 4]     = verts[0]
-            all_verts_flat[i * 4 + 1] = verts[1]
-            all_verts_flat[i * 4 + 2] = verts[2]
-            all_verts_flat[i * 4 + 3] = verts[3]
-
-        # Vectorized round to 3dp
-        rounded_real = np.round(all_verts_flat.real, 3)
-        rounded_imag = np.round(all_verts_flat.imag, 3)
-
-        # Build vertex -> tiles dict using pre-rounded values
-        vertex_to_tiles = {}
-        for i, tile in enumerate(tile_list):
-            base = i * 4
-            for j in range(4):
-                idx = base + j
-                rk = (rounded_real[idx], rounded_imag[idx])
-                bucket = vertex_to_tiles.get(rk)
-                if bucket is None:
-                    vertex_to_tiles[rk] = [tile]
-                else:
-                    bucket.append(tile)
+        n = len(store)
+        indptr = store.neighbor_indptr
+        indices = store.neighbor_indices
 
-        # ---- Pre-compute validity flags with fast neighbor counting ----
+        # ---- Vertex ids: dense ids of the exact lattice vertex keys ----
+        uniq, corner_vid = np.unique(store.vertex_keys().ravel(), return_inverse=True)
+        vcount = len(uniq)
+        corner_tile = np.repeat(np.arange(n), 4)
+
+        # ---- Validity flags from CSR dart-neighbor counts ----
         # A valid star kite: is_kite=True and exactly 2 dart neighbors
         # A valid starburst dart: is_kite=False and exactly 2 dart neighbors
-        valid_star_kite = set()
-        valid_burst_dart = set()
-        for tile in tile_list:
-            # Count dart neighbors using a simple loop (faster than generator + sum)
-            dart_count = 0
-            for n in tile.neighbors:
-                if not n.is_kite:
-                    dart_count += 1
-            if dart_count == 2:
-                if tile.is_kite:
-                    valid_star_kite.add(id(tile))
-                else:
-                    valid_burst_dart.add(id(tile))
-
-        pattern_tiles = set()   # tile ids already claimed by a pattern
-        star_groups = []
-        burst_groups = []
-
-        # ---- Single pass over vertex index ----
-        for tiles_at_v in vertex_to_tiles.values():
-            count = len(tiles_at_v)
-
-            # Quick rejection: stars need 5+ tiles, starbursts need 10+
-            if count < 5:
-                continue
-
-            # --- Star: 5 valid kites sharing this vertex ---
-            if count >= 5:
-                star_candidates = [t for t in tiles_at_v
-                                   if id(t) in valid_star_kite and id(t) not in pattern_tiles]
-                if len(star_candidates) == 5:
-                    star_groups.append(star_candidates)
-                    for t in star_candidates:
-                        pattern_tiles.add(id(t))
-                    continue
-
-            # --- Starburst: 10 valid darts sharing this vertex ---
-            if count >= 10:
-                burst_candidates = [t for t in tiles_at_v
-                                    if id(t) in valid_burst_dart and id(t) not in pattern_tiles]
-                if len(burst_candidates) == 10:
-                    burst_groups.append(burst_candidates)
-                    for t in burst_candidates:
-                        pattern_tiles.add(id(t))
-
-        # ---- Collect star/burst tile IDs ----
-        star_ids = set()
-        for group in star_groups:
-            for t in group:
-                star_ids.add(id(t))
-        burst_ids = set()
-        for group in burst_groups:
-            for t in group:
-                burst_ids.add(id(t))
+        if dart_count is None:
+            rows = np.repeat(np.arange(n), np.diff(indptr))
+            dart_count = np.bincount(rows, weights=~store.is_kite[indices], minlength=n)
+        two_darts = dart_count == 2
+        valid_star_kite = two_darts & store.is_kite
+        valid_burst_dart = two_darts & ~store.is_kite
+
+        star_count, star_idx = self._claim_pattern_vertices(
+            corner_vid, corner_tile, vcount, valid_star_kite, 5)
+        burst_count, burst_idx = self._claim_pattern_vertices(
+            corner_vid, corner_tile, vcount, valid_burst_dart, 10)
 
         # ---- Detect 5-fold symmetric vertices ----
         # Vertices shared by exactly 5 or 10 tiles are 5-fold symmetric
         # (stars, starbursts, and other Penrose vertex figures)
-        symmetry_tile_ids = set()
-        for tiles_at_v in vertex_to_tiles.values():
-            count = len(tiles_at_v)
-            if count == 5 or count == 10:
-                for t in tiles_at_v:
-                    symmetry_tile_ids.add(id(t))
+        tiles_per_vertex = np.bincount(corner_vid, minlength=vcount)
+        symmetric = (tiles_per_vertex == 5) | (tiles_per_vertex == 10)
+        symmetry_indices = np.unique(corner_tile[symmetric[corner_vid]])
 
         # ---- Spatial region blend via iterative neighbor diffusion ----
         # Seed each tile with its is_kite value, then average with neighbors
         # over multiple passes to create smooth spatial regions.
-        n = len(tile_list)
-        blend = np.array([1.0 if t.is_kite else 0.0 for t in tile_list],
-                         dtype=np.float64)
-
-        # Build index lookup for fast neighbor resolution
-        tile_to_idx = {id(t): i for i, t in enumerate(tile_list)}
-
-        # Pre-build neighbor index lists (once, reused across passes)
-        neighbor_indices = []
-        for tile in tile_list:
-            indices = []
-            for nb in tile.neighbors:
-                idx = tile_to_idx.get(id(nb))
-                if idx is not None:
-                    indices.append(idx)
-            neighbor_indices.append(indices)
-
-        # Diffusion: 2 passes, each tile = 40% self + 60% neighbor average
-        # Very few passes keeps fine-grained, tile-level variation visible
-        for _pass in range(2):
-            new_blend = np.empty(n, dtype=np.float64)
-            for i in range(n):
-                nb_idx = neighbor_indices[i]
-                if nb_idx:
-                    nb_avg = 0.0
-                    for j in nb_idx:
-                        nb_avg += blend[j]
-                    nb_avg /= len(nb_idx)
-                    new_blend[i] = blend[i] * 0.4 + nb_avg * 0.6
-                else:
-                    new_blend[i] = blend[i]
-            blend = new_blend
+        blend = store.is_kite.astype(np.float64)
+
+        # Diffusion as a CSR mat-vec per pass (default 2 passes, each tile =
+        # 40% self + 60% neighbor average). Very few passes keeps fine-grained,
+        # tile-level variation visible.
+        blend = self._diffuse(blend, indptr, indices,
+                              self.blend_passes, self.blend_self_weight)
 
         # Single smoothstep for gentle contrast boost (preserves granularity)
         blend = blend * blend * (3.0 - 2.0 * blend)
 
-        # ---- Assign pattern data to tiles ----
-        for i, tile in enumerate(tile_list):
-            tid = id(tile)
-            if tid in star_ids:
-                tile.pattern_type = 1.0
-                tile.blend_factor = 0.3
-            elif tid in burst_ids:
-                tile.pattern_type = 2.0
-                tile.blend_factor = 0.7
-            else:
-                tile.blend_factor = float(blend[i])
-                tile.pattern_type = 0.0
-
-        return len(star_groups), len(burst_groups), symmetry_tile_ids
+        # ---- Assign pattern data to columns ----
+        pattern_type_col = np.zeros(n, dtype=np.float32)
+        blend_factor_col = blend.astype(np.float32)
+        pattern_type_col[star_idx] = 1.0
+        blend_factor_col[star_idx] = 0.3
+        pattern_type_col[burst_idx] = 2.0
+        blend_factor_col[burst_idx] = 0.7
+
+        return star_count, burst_count, symmetry_indices, pattern_type_col, blend_factor_col
+
+    @staticmethod
+    def _diffuse(values, indptr, indices, passes, self_weight):
+        """Neighbor-mean diffusion over a CSR adjacency.
+
+        Each pass: v = self_weight * v + (1 - self_weight) * mean(v[neighbors]).
+        Tiles without neighbors keep their value. Row sums use np.add.reduceat
+        over the non-empty rows (reduceat misbehaves on empty segments).
+        """
+        degree = np.diff(indptr)
+        has_nb = degree > 0
+        starts = indptr[:-1][has_nb]
+        inv_degree = 1.0 / degree[has_nb]
+        nb_weight = 1.0 - self_weight
+        for _pass in range(passes):
+            if len(starts) == 0:
+                break
+            nb_mean = np.add.reduceat(values[indices], starts) * inv_degree
+            new_values = values.copy()
+            new_values[has_nb] = values[has_nb] * self_weight + nb_mean * nb_weight
+            values = new_values
+        return values
+
+    @staticmethod
+    def _claim_pattern_vertices(corner_vid, corner_tile, vcount, valid, need):
+        """Find vertices with exactly `need` valid tiles and claim their tiles.
+
+        A tile may only belong to one pattern. When two candidate vertices
+        share a tile, the vertex seen first (lowest corner index) wins, which
+        is the order the old dict-based vertex scan used.
+
+        Returns (pattern_count, claimed_tile_indices).
+        """
+        corner_valid = valid[corner_tile]
+        per_vertex = np.bincount(corner_vid[corner_valid], minlength=vcount)
+        candidate = per_vertex == need
+        sel = corner_valid & candidate[corner_vid]
+        cand_vid = corner_vid[sel]
+        cand_tile = corner_tile[sel]
+        if len(cand_tile) == 0:
+            return 0, cand_tile
+
+        # Fast path: no tile is shared between candidate vertices
+        if np.bincount(cand_tile).max() <= 1:
+            return int(np.count_nonzero(candidate)), cand_tile
+
+        # Resolve shared tiles greedily in first-seen vertex order
+        first_seen = np.full(vcount, len(corner_vid), dtype=np.int64)
+        np.minimum.at(first_seen, corner_vid, np.arange(len(corner_vid)))
+        order = np.lexsort((cand_vid, first_seen[cand_vid]))
+        cand_tile = cand_tile[order]
+        claimed = np.zeros(len(valid), dtype=bool)
+        count = 0
+        for start in range(0, len(cand_tile), need):
+            group = cand_tile[start:start + need]
+            if not claimed[group].any():
+                claimed[group] = True
+                count += 1
+        return count, np.flatnonzero(claimed)
 
     # -------------------------------------------------------------------------
     # GPU buffer packing
     # -------------------------------------------------------------------------
 
-    def _pack_gpu_buffers_staged(self, tile_list, gamma):
-        """Pack tile geometry into numpy arrays (runs on background thread).
+    def _pack_gpu_buffers_staged(self, store, gamma):
+        """Fill the store's GPU arrays in place (runs on background thread).
         Returns (gpu_vertices, gpu_tile_data). Uses default pattern values
-        since pattern detection has not run yet at this stage.
+        (or the previous generation's, where keys match) since pattern
+        detection has not run yet at this stage.
         """
-        n = len(tile_list)
+        n = len(store)
         if n == 0:
-            return (np.zeros((0, 4, 2), dtype=np.float32),
-                    np.zeros((0, 8), dtype=np.float32))
+            return store.gpu_vertices, store.gpu_tile_data
 
         shift_offset = sum(z * g for z, g in zip(self.zeta, gamma))
-        sx, sy = shift_offset.real, shift_offset.imag
 
-        ribbon = np.array(
-            [[(v.real, v.imag) for v in tile.vertices[:4]] for tile in tile_list],
-            dtype=np.float32)  # (N, 4, 2)
+        # Ribbon -> camera space: (v - shift_offset) / 2.5
+        cam = (store.vertices - shift_offset) * (1.0 / 2.5)
+        ribbon = store.gpu_vertices
+        ribbon[:, :, 0] = cam.real
+        ribbon[:, :, 1] = cam.imag
 
-        ribbon[:, :, 0] -= sx
-        ribbon[:, :, 1] -= sy
-        ribbon *= (1.0 / 2.5)
+        data = store.gpu_tile_data
+        data[:, COL_IS_KITE] = store.is_kite
+        data[:, COL_PATTERN_TYPE] = 0.0   # default (updated in Pass 2)
+        data[:, COL_BLEND_FACTOR] = 0.5   # default (updated in Pass 2)
 
-        data = np.empty((n, 8), dtype=np.float32)
-        data[:, 0] = np.array([1.0 if t.is_kite else 0.0 for t in tile_list], dtype=np.float32)
+        # Patterns last seen for these cells (disk cache), where known
+        if store.seed_patterns is not None:
+            seed_pattern, seed_blend = store.seed_patterns
+            known = ~np.isnan(seed_pattern)
+            data[known, COL_PATTERN_TYPE] = seed_pattern[known]
+            data[known, COL_BLEND_FACTOR] = seed_blend[known]
 
         # Carry over blend_factor and pattern_type from previous generation
         # so tiles don't flash to flat coloring while Pass 2 computes
-        prev = self._prev_blend_map
-        if prev:
-            for i, t in enumerate(tile_list):
-                key = (t.r, t.s, t.kr, t.ks)
-                if key in prev:
-                    data[i, 1] = prev[key][1]  # pattern_type
-                    data[i, 2] = prev[key][0]  # blend_factor
-                else:
-                    data[i, 1] = 0.0
-                    data[i, 2] = 0.5
-        else:
-            data[:, 1] = 0.0   # pattern_type: default (updated in Pass 2)
-            data[:, 2] = 0.5   # blend_factor: default (updated in Pass 2)
-        data[:, 3] = 0.0   # selected
-        data[:, 4] = 0.0   # hovered
-        data[:, 5] = 0.0   # anim_phase
-        data[:, 6] = 0.0   # anim_type
-        data[:, 7] = np.array([float(hash((t.r, t.s, t.kr, t.ks)) % 10000) / 10000.0
-                               for t in tile_list], dtype=np.float32)
+        prev = self._prev_patterns
+        if prev is not None:
+            prev_keys, prev_pattern, prev_blend = prev
+            order = np.argsort(prev_keys)
+            sorted_keys = prev_keys[order]
+            if len(sorted_keys):
+                pos = np.minimum(np.searchsorted(sorted_keys, store.keys),
+                                 len(sorted_keys) - 1)
+                hit = sorted_keys[pos] == store.keys
+                src = order[pos[hit]]
+                data[hit, COL_PATTERN_TYPE] = prev_pattern[src]
+                data[hit, COL_BLEND_FACTOR] = prev_blend[src]
+
+        data[:, COL_SELECTED] = 0.0
+        data[:, COL_HOVERED] = 0.0
+        data[:, COL_ANIM_PHASE] = 0.0
+        data[:, COL_ANIM_TYPE] = 0.0
+        data[:, COL_TILE_ID] = tile_ids(store.keys)
 
         return ribbon, data
 
@@ -736,19 +1548,15 @@ class TileDataManager:
         if tile_index < 0 or tile_index >= self.tile_count:
             return
 
-        tile = self.tile_list[tile_index]
+        row = self.gpu_tile_data[tile_index]
         if selected is not None:
-            tile.selected = selected
-            self.gpu_tile_data[tile_index, 3] = 1.0 if selected else 0.0
+            row[COL_SELECTED] = 1.0 if selected else 0.0
         if hovered is not None:
-            tile.hovered = hovered
-            self.gpu_tile_data[tile_index, 4] = 1.0 if hovered else 0.0
+            row[COL_HOVERED] = 1.0 if hovered else 0.0
         if anim_phase is not None:
-            tile.anim_phase = anim_phase
-            self.gpu_tile_data[tile_index, 5] = anim_phase
+            row[COL_ANIM_PHASE] = anim_phase
         if anim_type is not None:
-            tile.anim_type = anim_type
-            self.gpu_tile_data[tile_index, 6] = float(anim_type)
+            row[COL_ANIM_TYPE] = float(anim_type)
 
         self.gpu_data_dirty = True
 
@@ -756,40 +1564,38 @@ class TileDataManager:
         """
         Find which tile contains the given pentagrid-space point.
         Returns tile index or -1 if no tile found.
-        Vectorized numpy point-in-quad test against GPU vertex data.
+        Analytic lookup (see hit_test_points); cost doesn't grow with tile count.
         """
-        if self.gpu_vertices is None or self.tile_count == 0:
-            return -1
-
-        n = self.tile_count
-        v = self.gpu_vertices[:n]  # (N, 4, 2)
-        p = np.array([pentagrid_x, pentagrid_y], dtype=np.float32)
-
-        # Compute cross products for all 4 edges of all tiles at once
-        # Edge vectors: v[next] - v[current] for each of 4 edges
-        v0 = v[:, 0]  # (N, 2)
-        v1 = v[:, 1]
-        v2 = v[:, 2]
-        v3 = v[:, 3]
-
-        def cross2d(edge, w):
-            return edge[:, 0] * w[:, 1] - edge[:, 1] * w[:, 0]
-
-        c0 = cross2d(v1 - v0, p - v0)
-        c1 = cross2d(v2 - v1, p - v1)
-        c2 = cross2d(v3 - v2, p - v2)
-        c3 = cross2d(v0 - v3, p - v3)
-
-        # Point is inside if all cross products have the same sign
-        all_pos = (c0 >= 0) & (c1 >= 0) & (c2 >= 0) & (c3 >= 0)
-        all_neg = (c0 <= 0) & (c1 <= 0) & (c2 <= 0) & (c3 <= 0)
-        inside = all_pos | all_neg
-
-        hits = np.where(inside)[0]
-        if len(hits) > 0:
-            return int(hits[0])
-        return -1
-
-    def get_tile_index(self, tile):
-        """O(1) lookup of a tile's index in tile_list. Returns -1 if not found."""
-        return self._tile_index_map.get(id(tile), -1)
+        return int(self.hit_test_points(((pentagrid_x, pentagrid_y),))[0])
+
+    def hit_test_points(self, points):
+        """Batched hit test: tile index per pentagrid-space point (x, y),
+        -1 where no tile of the current set contains it. The containing
+        tile's key is found from the point's grid indices (locate_keys, the
+        CPU port of the shader's findTile) and mapped through the store's
+        key index.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if self.tile_count == 0:
+            return np.full(len(points), -1, dtype=np.int64)
+        keys = locate_keys(points, self._current_gamma)
+        return np.where(keys >= 0, self.store.index_of(keys), -1)
+
+    def query_point(self, pentagrid_x, pentagrid_y):
+        """Tile containing a pentagrid-space point via the spatial index,
+        or -1."""
+        return self.store.query_point(pentagrid_x, pentagrid_y)
+
+    def query_rect(self, min_x, min_y, max_x, max_y):
+        """Indices of tiles whose centroid lies in a pentagrid-space rectangle."""
+        return self.store.query_rect(min_x, min_y, max_x, max_y)
+
+    def query_radius(self, pentagrid_x, pentagrid_y, radius):
+        """Indices of tiles whose centroid lies within radius of a point."""
+        return self.store.query_radius(pentagrid_x, pentagrid_y, radius)
+
+    def get_neighbors(self, tile_index):
+        """Neighbor tile indices of a tile in the current store."""
+        if tile_index < 0 or tile_index >= self.tile_count:
+            return ()
+        return self.store.neighbors_of(tile_index)
@@ -0,0 +1,664 @@
+# penrose_tools/TileStore.py
+"""
+Structure-of-arrays tile storage for the overlay rendering system.
+Holds every overlay tile as contiguous NumPy columns:
+- Pentagrid indices (r, s, kr, ks) and a packed int64 key per tile
+- The exact Z^5 lattice vector of each tile, from which vertex and edge keys
+  are packed into int64 (no float rounding anywhere in neighbor / pattern keys)
+- gpu_vertices / gpu_tile_data: the exact buffers uploaded by OverlayRenderer,
+  so pattern and interaction columns are views, never copies
+- generate_tiles() builds a store for a camera-space rectangle; keys are
+  in the frame findTile() uses, so locate_keys() finds them
+- A uniform-grid spatial index (CSR rows per world cell) for point,
+  rectangle and radius queries
+"""
+import math
+import numpy as np
+
+# Fifth roots of unity (lattice -> ribbon-space projection)
+_ZETA = np.exp(2j * np.pi * np.arange(5) / 5)
+
+# gpu_tile_data column layout (matches tile_overlay.vert a_tile_data1/2)
+COL_IS_KITE = 0
+COL_PATTERN_TYPE = 1
+COL_BLEND_FACTOR = 2
+COL_SELECTED = 3
+COL_HOVERED = 4
+COL_ANIM_PHASE = 5
+COL_ANIM_TYPE = 6
+COL_TILE_ID = 7
+
+# Key layout: [pair (r*5+s) : 7 bits][kr : 28 bits][ks : 28 bits]
+_K_BITS = 28
+_K_OFFSET = 1 << (_K_BITS - 1)
+_K_MASK = (1 << _K_BITS) - 1
+
+
+def pack_keys(r, s, kr, ks):
+    """Pack pentagrid indices into int64 keys. Accepts scalars or arrays."""
+    r = np.asarray(r, dtype=np.int64)
+    s = np.asarray(s, dtype=np.int64)
+    kr = np.asarray(kr, dtype=np.int64)
+    ks = np.asarray(ks, dtype=np.int64)
+    return (((r * 5 + s) << (2 * _K_BITS))
+            | ((kr + _K_OFFSET) << _K_BITS)
+            | (ks + _K_OFFSET))
+
+
+def unpack_keys(keys):
+    """Inverse of pack_keys. Returns (r, s, kr, ks) int64 arrays."""
+    keys = np.asarray(keys, dtype=np.int64)
+    pair = keys >> (2 * _K_BITS)
+    kr = ((keys >> _K_BITS) & _K_MASK) - _K_OFFSET
+    ks = (keys & _K_MASK) - _K_OFFSET
+    return pair // 5, pair % 5, kr, ks
+
+
+# Lattice key layout: k[1..4] - k[0], 15 bits each (60 bits). Differences are
+# used because k and k + (1, 1, 1, 1, 1) project to the same point.
+_L_BITS = 15
+_L_OFFSET = 1 << (_L_BITS - 1)
+_L_MASK = (1 << _L_BITS) - 1
+
+# Rhombus corners in (dkr, dks) order, and edges as (lower corner, axis)
+# where axis 0 = direction r, 1 = direction s
+CORNER_OFFSETS = ((0, 0), (1, 0), (1, 1), (0, 1))
+EDGES = ((0, 0), (1, 1), (3, 0), (0, 1))
+
+
+# Change of a packed lattice key when k[d] increases by 1 (in range)
+_LATTICE_STEP = np.array(
+    [-sum(1 << (_L_BITS * j) for j in range(4))]
+    + [1 << (_L_BITS * (3 - j)) for j in range(4)], dtype=np.int64)
+
+
+def pack_lattice(k):
+    """Pack Z^5 lattice points (..., 5) into int64 vertex keys.
+    Exact while every |k[d] - k[0]| < 2**14.
+    """
+    k = np.asarray(k, dtype=np.int64)
+    d = (k[..., 1:] - k[..., :1] + _L_OFFSET) & _L_MASK
+    return ((d[..., 0] << (3 * _L_BITS)) | (d[..., 1] << (2 * _L_BITS))
+            | (d[..., 2] << _L_BITS) | d[..., 3])
+
+
+# findTile candidates (pentagrid_common.glsl): for each direction pair, the
+# rhombi of the 4 grid intersections around the point's fractional indices
+_CAND_R, _CAND_S, _CAND_DR, _CAND_DS = (np.array(c, dtype=np.int64) for c in zip(*[
+    (r, s, dr, ds) for r in range(5) for s in range(r + 1, 5)
+    for dr in (0, 1) for ds in (0, 1)]))
+
+
+def locate_keys(points, gamma, batch=4096):
+    """Packed key of the pentagrid tile containing each camera-space point
+    (x, y), or -1. A NumPy port of findTile in pentagrid_common.glsl: only
+    the 40 candidate rhombi around the point's grid indices are tested, so
+    the cost is independent of how many tiles exist. Candidates are tried
+    in the shader's order; the first containing rhombus wins.
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    gamma = np.asarray(gamma, dtype=np.float64)
+    zeta_r = _ZETA[_CAND_R]
+    zeta_s = _ZETA[_CAND_S]
+    denom = _ZETA[_CAND_S - _CAND_R].imag
+    dirs = np.arange(5)
+    keys = np.full(len(pts), -1, dtype=np.int64)
+
+    for start in range(0, len(pts), batch):
+        p = pts[start:start + batch]
+        # Fractional grid index per direction, and the point in ribbon space
+        pindex = p[:, :1] * _ZETA.real + p[:, 1:] * _ZETA.imag + gamma       # (M, 5)
+        rb = pindex @ _ZETA                                                  # (M,)
+
+        kr = np.floor(pindex[:, _CAND_R]) + _CAND_DR                         # (M, 40)
+        ks = np.floor(pindex[:, _CAND_S]) + _CAND_DS
+        z0 = 1j * (zeta_r * (ks - gamma[_CAND_S]) - zeta_s * (kr - gamma[_CAND_R])) / denom
+        k = -np.floor(-((z0[..., None] / _ZETA).real + gamma))               # (M, 40, 5)
+        k = np.where(dirs == _CAND_R[:, None], kr[..., None], k)
+        k = np.where(dirs == _CAND_S[:, None], ks[..., None], k)
+        v0 = k @ _ZETA
+        quad = (v0, v0 + zeta_r, v0 + zeta_r + zeta_s, v0 + zeta_s)
+
+        # Point in quad: same side of all 4 edges (cross product signs)
+        w = rb[:, None]
+        cross = [((quad[(i + 1) % 4] - quad[i]).conj() * (w - quad[i])).imag for i in range(4)]
+        inside = (((cross[0] >= 0) & (cross[1] >= 0) & (cross[2] >= 0) & (cross[3] >= 0))
+                  | ((cross[0] <= 0) & (cross[1] <= 0) & (cross[2] <= 0) & (cross[3] <= 0)))
+
+        first = inside.argmax(axis=1)
+        found = inside[np.arange(len(p)), first]
+        cand = first[found]
+        rows = np.flatnonzero(found)
+        keys[start + rows] = pack_keys(_CAND_R[cand], _CAND_S[cand],
+                                       kr[rows, cand].astype(np.int64),
+                                       ks[rows, cand].astype(np.int64))
+    return keys
+
+
+# A tile vertex sits at z0 + sum(c[d] * zeta[d]) / 2.5 with c[d] in [0, 1],
+# where z0 is the grid-line intersection in camera space. These are the
+# per-axis extremes of that offset, used to pad gen_bounds for z0.
+_COS_D = np.cos(2.0 * math.pi * np.arange(5) / 5.0)
+_SIN_D = np.sin(2.0 * math.pi * np.arange(5) / 5.0)
+_VERTEX_OFFSET_X = (_COS_D[_COS_D < 0].sum() / 2.5, _COS_D[_COS_D > 0].sum() / 2.5)
+_VERTEX_OFFSET_Y = (_SIN_D[_SIN_D < 0].sum() / 2.5, _SIN_D[_SIN_D > 0].sum() / 2.5)
+
+
+def generate_tiles(gen_bounds, gamma, exact_index_ranges=True, cancelled=None):
+    """Generate a TileStore of every tile with a vertex in the camera-space
+    rectangle gen_bounds (vectorized). Keys are in findTile's frame
+    (ribbon = 2.5 * p + sum(zeta * gamma)).
+
+    For each (r, s) direction pair, all (kr, ks) grid intersections are
+    computed in bulk using NumPy, then bounds-checked with vectorized ops.
+    The surviving rows of every pair are concatenated into column arrays;
+    no per-tile Python objects are created. exact_index_ranges picks the
+    exact (kr, ks) parallelogram per pair over the legacy square window;
+    once cancelled() returns True the tiles so far are returned.
+    """
+    min_x, min_y, max_x, max_y = gen_bounds
+
+    zeta = _ZETA
+    gamma_arr = np.array(gamma, dtype=np.float64)         # (5,)
+
+    # shift_offset for ribbon -> camera conversion
+    shift_offset = np.sum(zeta * gamma_arr)
+    inv_2_5 = 1.0 / 2.5
+
+    # Precompute zeta reciprocals for the k-vector floor computation
+    # k[d] = ceil(Re(z0 / zeta[d]) + gamma[d])  (the 0 - -x // 1 trick)
+    zeta_inv = 1.0 / zeta  # (5,) complex
+
+    if not exact_index_ranges:
+        # Legacy square window: viewport center and search radius
+        cx = (min_x + max_x) * 0.5
+        cy = (min_y + max_y) * 0.5
+        hw = (max_x - min_x) * 0.5
+        hh = (max_y - min_y) * 0.5
+        viewport_radius = max(hw, hh)
+
+        # Center indices for each pentagrid direction
+        thetas = 2.0 * math.pi * np.arange(5) / 5.0
+        center_indices = cx * np.cos(thetas) + cy * np.sin(thetas) + gamma_arr
+        search_radius = int(viewport_radius * 2.5) + 3
+
+    # The 4 vertex corner offsets for each rhombus: (dkr, dks)
+    corner_offsets = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float64)  # (4, 2)
+
+    parts = []  # (r, s, k) arrays per direction pair
+
+    for r in range(5):
+        zeta_r = zeta[r]
+        for s in range(r + 1, 5):
+            if cancelled is not None and cancelled():
+                return TileStore.concatenate(parts)
+
+            zeta_s = zeta[s]
+            denom = zeta[s - r].imag  # scalar
+
+            # Build all (kr, ks) pairs for this (r, s) as arrays
+            if exact_index_ranges:
+                kr_flat, ks_flat = _parallelogram_indices(
+                    r, s, gen_bounds, gamma_arr, zeta)
+            else:
+                kr_center = int(round(center_indices[r]))
+                ks_center = int(round(center_indices[s]))
+                kr_range = np.arange(kr_center - search_radius, kr_center + search_radius + 1, dtype=np.float64)
+                ks_range = np.arange(ks_center - search_radius, ks_center + search_radius + 1, dtype=np.float64)
+                KR, KS = np.meshgrid(kr_range, ks_range, indexing='ij')
+                kr_flat = KR.ravel()  # (M,)
+                ks_flat = KS.ravel()  # (M,)
+            M = len(kr_flat)
+            if M == 0:
+                continue
+
+            # ---- Vectorized z0 computation ----
+            # z0 = 1j * (zeta[r] * (ks - gamma[s]) - zeta[s] * (kr - gamma[r])) / denom
+            z0 = 1j * (zeta_r * (ks_flat - gamma_arr[s]) - zeta_s * (kr_flat - gamma_arr[r])) / denom
+            z0 = np.round(z0.real, 5) + 1j * np.round(z0.imag, 5)  # (M,) complex
+
+            # ---- Vectorized k-vector: k[d] = ceil(Re(z0 / zeta[d]) + gamma[d]) ----
+            # z0[:, None] / zeta[None, :] -> (M, 5)
+            z0_over_zeta = z0[:, None] * zeta_inv[None, :]  # (M, 5) complex
+            # The original uses: 0 - -(Re(z0/t) + p) // 1  which equals ceil(...) for non-integer
+            # np.floor gives the //1 part; 0 - -x//1 = -(-x//1) = ceil(x) for non-integers
+            k_base = -np.floor(-(z0_over_zeta.real + gamma_arr[None, :]))  # (M, 5)
+
+            # ---- Vectorized 4 vertices per tile ----
+            # For each corner (dkr, dks), set k[r] = kr + dkr, k[s] = ks + dks
+            # vertex = sum(k[d] * zeta[d] for d in range(5))
+            # = sum(k_base[d] * zeta[d]) + dkr * zeta[r] + dks * zeta[s]  (since only k[r],k[s] change)
+            #
+            # base_vertex = sum over d of k_base[d] * zeta[d]
+            # but k_base[r] and k_base[s] are overwritten by kr, ks in the original code
+            # So: vertex = sum_{d != r,s}(k_base[d] * zeta[d]) + (kr+dkr)*zeta[r] + (ks+dks)*zeta[s]
+
+            # Sum over non-(r,s) directions
+            mask = np.ones(5, dtype=bool)
+            mask[r] = False
+            mask[s] = False
+            # base_sum = sum of k_base[d] * zeta[d] for d not in {r, s}
+            base_sum = np.sum(k_base[:, mask] * zeta[None, mask], axis=1)  # (M,) complex
+
+            # 4 vertices: shape (M, 4) complex
+            # (float projection, only used for the bounds check; tiles
+            # keep their exact lattice vector)
+            all_verts = np.empty((M, 4), dtype=np.complex128)
+            for ci, (dkr, dks) in enumerate(corner_offsets):
+                all_verts[:, ci] = base_sum + (kr_flat + dkr) * zeta_r + (ks_flat + dks) * zeta_s
+
+            # ---- Vectorized bounds check in camera space ----
+            # p_cam = (ribbon - shift_offset) / 2.5
+            cam_verts = (all_verts - shift_offset) * inv_2_5  # (M, 4) complex
+            cam_x = cam_verts.real  # (M, 4)
+            cam_y = cam_verts.imag  # (M, 4)
+
+            # Tile is in bounds if ANY of its 4 vertices is inside gen_bounds
+            in_x = (cam_x >= min_x) & (cam_x <= max_x)  # (M, 4) bool
+            in_y = (cam_y >= min_y) & (cam_y <= max_y)
+            in_bounds = np.any(in_x & in_y, axis=1)  # (M,) bool
+
+            # ---- Keep only visible rows ----
+            keep = np.nonzero(in_bounds)[0]
+            if len(keep) == 0:
+                continue
+            k = k_base[keep].astype(np.int32)
+            k[:, r] = kr_flat[keep]
+            k[:, s] = ks_flat[keep]
+            parts.append((
+                np.full(len(keep), r, dtype=np.int8),
+                np.full(len(keep), s, dtype=np.int8),
+                k,
+            ))
+
+    return TileStore.concatenate(parts)
+
+
+def _parallelogram_indices(r, s, gen_bounds, gamma_arr, zeta):
+    """Exact (kr, ks) candidates whose tile can touch gen_bounds.
+
+    The intersection z0 is affine in (kr, ks):
+        z0 = A * (kr - gamma[r]) + B * (ks - gamma[s])
+    so the set of z0 positions that can yield an in-bounds vertex (gen_bounds
+    padded by the vertex offset extremes) maps to a parallelogram in
+    (kr, ks) index space. For each kr in range we clip the line of ks
+    values against the padded rectangle, giving one ks interval per kr.
+
+    Returns (kr_flat, ks_flat) as float64 arrays, like the square window.
+    """
+    min_x, min_y, max_x, max_y = gen_bounds
+    eps = 1e-6
+    x0 = min_x - _VERTEX_OFFSET_X[1] - eps
+    x1 = max_x - _VERTEX_OFFSET_X[0] + eps
+    y0 = min_y - _VERTEX_OFFSET_Y[1] - eps
+    y1 = max_y - _VERTEX_OFFSET_Y[0] + eps
+
+    gr = gamma_arr[r]
+    gs = gamma_arr[s]
+    denom = zeta[s - r].imag
+    a = -1j * zeta[s] / denom   # dz0 / dkr
+    b = 1j * zeta[r] / denom    # dz0 / dks
+
+    # kr = dot(z0, zeta[r]) + gamma[r] is extremal at a rectangle corner
+    ex, ey = zeta[r].real, zeta[r].imag
+    corner_k = [x * ex + y * ey + gr for x in (x0, x1) for y in (y0, y1)]
+    kr = np.arange(math.ceil(min(corner_k)), math.floor(max(corner_k)) + 1,
+                   dtype=np.float64)
+    if len(kr) == 0:
+        return kr, kr
+
+    lo = np.full(len(kr), -np.inf)
+    hi = np.full(len(kr), np.inf)
+    for base, step, bmin, bmax in ((a.real * (kr - gr), b.real, x0, x1),
+                                   (a.imag * (kr - gr), b.imag, y0, y1)):
+        if abs(step) > 1e-12:
+            t0 = (bmin - base) / step + gs
+            t1 = (bmax - base) / step + gs
+            lo = np.maximum(lo, np.minimum(t0, t1))
+            hi = np.minimum(hi, np.maximum(t0, t1))
+        else:
+            # Line of constant coordinate: all-or-nothing per kr
+            outside = (base < bmin) | (base > bmax)
+            lo[outside] = np.inf
+            hi[outside] = -np.inf
+
+    valid = np.isfinite(lo) & np.isfinite(hi)
+    ks_lo = np.where(valid, np.ceil(np.where(valid, lo, 0.0)), 0.0)
+    ks_hi = np.where(valid, np.floor(np.where(valid, hi, 0.0)), -1.0)
+    counts = np.maximum(ks_hi - ks_lo + 1, 0).astype(np.int64)
+
+    total = int(counts.sum())
+    kr_flat = np.repeat(kr, counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    ks_flat = np.repeat(ks_lo, counts) + (np.arange(total) - starts)
+    return kr_flat, ks_flat.astype(np.float64)
+
+
+def tile_ids(keys):
+    """Stable pseudo-random tile id in [0, 1) per key (integer mix, vectorized)."""
+    h = np.asarray(keys, dtype=np.int64).astype(np.uint64)
+    h = (h ^ (h >> np.uint64(31))) * np.uint64(0x7FB5D329728EA185)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x81DADEF4BC2DD44D)
+    h = h ^ (h >> np.uint64(33))
+    return (h % np.uint64(10000)).astype(np.float32) / np.float32(10000.0)
+
+
+class TileStore:
+    """
+    Column store for one generated tile set.
+    Row i of every array describes the same tile; the row index is the tile
+    index used by InteractionManager (OverlayRenderer maps rows to stable
+    GPU instance slots by key).
+    """
+
+    def __init__(self, r, s, k):
+        n = len(r)
+        self.r = np.ascontiguousarray(r, dtype=np.int8)
+        self.s = np.ascontiguousarray(s, dtype=np.int8)
+
+        # Z^5 lattice vector of corner 0 (k[r] = kr, k[s] = ks), shape (N, 5)
+        self.k = np.ascontiguousarray(k, dtype=np.int32).reshape(n, 5)
+        rows = np.arange(n)
+        self.kr = self.k[rows, self.r]
+        self.ks = self.k[rows, self.s]
+        self.keys = pack_keys(self.r, self.s, self.kr, self.ks)
+        self._vertices = None
+
+        # Tile type - determined purely from pentagrid indices (no trig needed)
+        diff = self.s.astype(np.int16) - self.r
+        self.is_kite = (diff == 1) | (diff == 4)
+
+        # GPU buffers, filled by TileDataManager._pack_gpu_buffers_staged
+        self.gpu_vertices = np.zeros((n, 4, 2), dtype=np.float32)
+        self.gpu_tile_data = np.zeros((n, 8), dtype=np.float32)
+
+        # Neighbor graph in CSR form (populated in Pass 2): the neighbors of
+        # tile i are neighbor_indices[neighbor_indptr[i]:neighbor_indptr[i+1]]
+        self.neighbor_indptr = None
+        self.neighbor_indices = None
+
+        self._sorted_keys = None
+        self._sorted_order = None
+        self._grid = None
+
+        # Uniform-grid spatial index over world cells (set_cell_index): the
+        # tiles whose camera-space centroid lies in cell c are
+        # cell_indices[cell_indptr[c]:cell_indptr[c+1]], cells row-major
+        # over cell_range (cx0, cy0, cx1, cy1)
+        self.cell_size = None
+        self.cell_range = None
+        self.cell_indptr = None
+        self.cell_indices = None
+        self.cell_layout = None     # [(cx, cy, tile count), ...] in row order
+        self._cam_centroids = None
+
+        # (pattern_type, blend_factor) remembered for these tiles by the disk
+        # cell cache, NaN where unknown; seeds Pass 1 before patterns exist
+        self.seed_patterns = None
+
+    @classmethod
+    def empty(cls):
+        z = np.zeros(0, dtype=np.int64)
+        return cls(z, z, np.zeros((0, 5), dtype=np.int32))
+
+    @classmethod
+    def concatenate(cls, parts):
+        """Build a store from a list of (r, s, k) array tuples."""
+        if not parts:
+            return cls.empty()
+        cols = list(zip(*parts))
+        return cls(*(np.concatenate(c) for c in cols))
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self):
+        """Memory held by the store's arrays (lookup tables included)."""
+        total = sum(v.nbytes for v in vars(self).values() if isinstance(v, np.ndarray))
+        if self._grid:
+            total += self._grid[0].nbytes
+        return total
+
+    # -------------------------------------------------------------------------
+    # Column views into the GPU tile data
+    # -------------------------------------------------------------------------
+
+    @property
+    def pattern_type(self):
+        return self.gpu_tile_data[:, COL_PATTERN_TYPE]
+
+    @property
+    def blend_factor(self):
+        return self.gpu_tile_data[:, COL_BLEND_FACTOR]
+
+    @property
+    def selected(self):
+        return self.gpu_tile_data[:, COL_SELECTED]
+
+    @property
+    def hovered(self):
+        return self.gpu_tile_data[:, COL_HOVERED]
+
+    # -------------------------------------------------------------------------
+    # Lattice geometry
+    # -------------------------------------------------------------------------
+
+    def corner_lattice(self):
+        """Lattice points of the 4 corners, int64 shape (N, 4, 5)."""
+        n = len(self)
+        rows = np.arange(n)
+        corners = np.repeat(self.k[:, None, :].astype(np.int64), 4, axis=1)
+        for c, (dkr, dks) in enumerate(CORNER_OFFSETS):
+            corners[rows, c, self.r] += dkr
+            corners[rows, c, self.s] += dks
+        return corners
+
+    def vertex_keys(self):
+        """Packed lattice key of every corner, int64 shape (N, 4).
+
+        pack_lattice is linear inside its range, so each corner is the packed
+        corner-0 key plus a per-direction step (no (N, 4, 5) intermediate).
+        """
+        base = pack_lattice(self.k)
+        r = self.r.astype(np.int64)
+        s = self.s.astype(np.int64)
+        keys = np.empty((len(base), 4), dtype=np.int64)
+        for c, (dkr, dks) in enumerate(CORNER_OFFSETS):
+            keys[:, c] = base + _LATTICE_STEP[r] * dkr + _LATTICE_STEP[s] * dks
+        return keys
+
+    def edge_keys(self):
+        """Packed key of every edge, int64 shape (N, 4): the lower endpoint's
+        vertex key with the edge's lattice direction (0-4) in the low 3 bits.
+        """
+        vkeys = self.vertex_keys()
+        dirs = np.stack([self.r, self.s], axis=1).astype(np.int64)
+        return np.stack([(vkeys[:, c] << 3) | dirs[:, axis] for c, axis in EDGES], axis=1)
+
+    @property
+    def vertices(self):
+        """Ribbon-space vertices projected from the lattice (complex128,
+        shape (N, 4)). Computed on first use."""
+        if self._vertices is None:
+            self._vertices = self.corner_lattice() @ _ZETA
+        return self._vertices
+
+    # -------------------------------------------------------------------------
+    # Lookup
+    # -------------------------------------------------------------------------
+
+    def index_of(self, keys):
+        """Map packed keys to row indices (-1 where absent). Vectorized.
+
+        Each (r, s) pair covers a compact (kr, ks) region, so lookups go
+        through a dense per-pair index grid (a direct gather). Stores whose
+        index ranges are too sparse for a grid fall back to a sorted search.
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        if len(self) == 0:
+            return np.full(keys.shape, -1, dtype=np.int64)
+        if self._grid is None:
+            self._grid = self._build_grid()
+        flat = keys.ravel()
+        if self._grid is False:
+            return self._search(flat).reshape(keys.shape)
+
+        table, base, kr0, ks0, width, height = self._grid
+        r, s, kr, ks = unpack_keys(flat)
+        pair = np.minimum(r * 5 + s, len(base) - 1)
+        dkr = kr - kr0[pair]
+        dks = ks - ks0[pair]
+        inside = (dkr >= 0) & (dkr < width[pair]) & (dks >= 0) & (dks < height[pair])
+        slot = np.where(inside, base[pair] + dkr * height[pair] + dks, 0)
+        return np.where(inside, table[slot], -1).reshape(keys.shape)
+
+    def _build_grid(self):
+        """Dense (kr, ks) -> row tables per pair, or False if too sparse."""
+        pair = self.r.astype(np.int64) * 5 + self.s
+        base = np.zeros(26, dtype=np.int64)
+        kr0 = np.zeros(26, dtype=np.int64)
+        ks0 = np.zeros(26, dtype=np.int64)
+        width = np.zeros(26, dtype=np.int64)
+        height = np.zeros(26, dtype=np.int64)
+        rows_by_pair = []
+        size = 0
+        for p in np.unique(pair):
+            rows = np.flatnonzero(pair == p)
+            kr = self.kr[rows]
+            ks = self.ks[rows]
+            kr0[p], ks0[p] = kr.min(), ks.min()
+            width[p] = kr.max() - kr0[p] + 1
+            height[p] = ks.max() - ks0[p] + 1
+            base[p] = size
+            size += int(width[p] * height[p])
+            rows_by_pair.append((p, rows))
+        if size > 16 * len(self) + 4096:
+            return False
+
+        table = np.full(size, -1, dtype=np.int64)
+        for p, rows in rows_by_pair:
+            slots = (base[p] + (self.kr[rows] - kr0[p]) * height[p]
+                     + (self.ks[rows] - ks0[p]))
+            table[slots] = rows
+        return table, base, kr0, ks0, width, height
+
+    def _search(self, flat):
+        if self._sorted_keys is None:
+            self._sorted_order = np.argsort(self.keys, kind='stable')
+            self._sorted_keys = self.keys[self._sorted_order]
+        # Sorted needles keep searchsorted cache-friendly on large batches
+        order = np.argsort(flat)
+        pos = np.empty(len(flat), dtype=np.int64)
+        pos[order] = np.searchsorted(self._sorted_keys, flat[order])
+        pos = np.minimum(pos, len(self._sorted_keys) - 1)
+        found = self._sorted_keys[pos] == flat
+        return np.where(found, self._sorted_order[pos], -1)
+
+    def key(self, index):
+        """Pentagrid key tuple (r, s, kr, ks) for one tile."""
+        return (int(self.r[index]), int(self.s[index]),
+                int(self.kr[index]), int(self.ks[index]))
+
+    def centroid(self, index):
+        """Centroid of one tile in ribbon space (complex)."""
+        return complex(self.vertices[index].sum() / 4.0)
+
+    def centroids(self, indices=None):
+        """Centroids in ribbon space (complex128 array)."""
+        verts = self.vertices if indices is None else self.vertices[indices]
+        return verts.sum(axis=1) * 0.25
+
+    # -------------------------------------------------------------------------
+    # Spatial index
+    # -------------------------------------------------------------------------
+
+    def set_cell_index(self, cell_size, cell_range, layout):
+        """Build the cell index from the store's cell layout: a list of
+        (cx, cy, count) covering every cell of cell_range, in row order (each
+        cell's tiles are one contiguous run of rows)."""
+        cx0, cy0, cx1, cy1 = cell_range
+        width = cx1 - cx0 + 1
+        cells = np.array(layout, dtype=np.int64).reshape(-1, 3)
+        linear = (cells[:, 1] - cy0) * width + (cells[:, 0] - cx0)
+        counts = cells[:, 2]
+        starts = np.cumsum(counts) - counts
+
+        order = np.argsort(linear, kind='stable')
+        counts = counts[order]
+        indptr = np.zeros(width * (cy1 - cy0 + 1) + 1, dtype=np.int64)
+        indptr[linear[order] + 1] = counts
+        np.cumsum(indptr, out=indptr)
+        # Row runs in cell order: row = run start + position within the run
+        offsets = np.repeat(starts[order] - indptr[linear[order]], counts)
+        self.cell_indices = offsets + np.arange(len(offsets), dtype=np.int64)
+        self.cell_indptr = indptr
+        self.cell_size = cell_size
+        self.cell_range = tuple(cell_range)
+        self.cell_layout = layout
+
+    def build_query_cache(self):
+        """Compute the camera-space centroids the spatial queries read, so
+        the worker can pay for them instead of the first query."""
+        if self._cam_centroids is None:
+            self._cam_centroids = self.gpu_vertices.mean(axis=1)
+
+    @property
+    def cam_centroids(self):
+        """Camera-space centroids (N, 2) from the packed GPU vertices."""
+        self.build_query_cache()
+        return self._cam_centroids
+
+    def _cells_in(self, min_x, min_y, max_x, max_y):
+        """Candidate rows from the index cells overlapping a rectangle (every
+        row when there is no index)."""
+        if self.cell_indptr is None:
+            return np.arange(len(self))
+        size = self.cell_size
+        cx0, cy0, cx1, cy1 = self.cell_range
+        x0 = max(cx0, math.floor(min_x / size))
+        x1 = min(cx1, math.floor(max_x / size))
+        y0 = max(cy0, math.floor(min_y / size))
+        y1 = min(cy1, math.floor(max_y / size))
+        if x0 > x1 or y0 > y1:
+            return np.zeros(0, dtype=np.int64)
+        # Cells x0..x1 of one row are adjacent in the CSR: one slice per row
+        width = cx1 - cx0 + 1
+        indptr = self.cell_indptr
+        runs = []
+        for cy in range(y0, y1 + 1):
+            base = (cy - cy0) * width - cx0
+            runs.append(self.cell_indices[indptr[base + x0]:indptr[base + x1 + 1]])
+        return np.concatenate(runs)
+
+    def query_rect(self, min_x, min_y, max_x, max_y):
+        """Rows whose camera-space centroid lies in the rectangle."""
+        rows = self._cells_in(min_x, min_y, max_x, max_y)
+        c = self.cam_centroids[rows]
+        inside = ((c[:, 0] >= min_x) & (c[:, 0] <= max_x)
+                  & (c[:, 1] >= min_y) & (c[:, 1] <= max_y))
+        return rows[inside]
+
+    def query_radius(self, x, y, radius):
+        """Rows whose camera-space centroid lies within radius of (x, y)."""
+        rows = self._cells_in(x - radius, y - radius, x + radius, y + radius)
+        d = self.cam_centroids[rows] - np.array((x, y), dtype=np.float32)
+        return rows[(d * d).sum(axis=1) <= radius * radius]
+
+    def query_point(self, x, y):
+        """Row of the tile containing camera point (x, y), or -1. A tile
+        reaches at most one edge (0.4) past its centroid's cell."""
+        rows = self._cells_in(x - 0.4, y - 0.4, x + 0.4, y + 0.4)
+        v = self.gpu_vertices[rows]                                  # (M, 4, 2)
+        e = np.roll(v, -1, axis=1) - v
+        w = np.array((x, y), dtype=np.float32) - v
+        cross = e[..., 0] * w[..., 1] - e[..., 1] * w[..., 0]       # (M, 4)
+        inside = (cross >= 0).all(axis=1) | (cross <= 0).all(axis=1)
+        hits = rows[inside]
+        return int(hits[0]) if len(hits) else -1
+
+    def neighbors_of(self, index):
+        """Neighbor tile indices of one tile (empty before Pass 2)."""
+        if self.neighbor_indptr is None:
+            return ()
+        return self.neighbor_indices[self.neighbor_indptr[index]:self.neighbor_indptr[index + 1]]
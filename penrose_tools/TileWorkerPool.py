@@ -0,0 +1,142 @@
+# penrose_tools/TileWorkerPool.py
+"""
+Optional process-pool backend for overlay tile generation.
+- A persistent pool of forked worker processes running TileStore.generate_tiles
+- Each job generates one rectangle of world cells (pure NumPy pentagrid math)
+- Results come back through multiprocessing.shared_memory: the worker writes the
+  tile columns (r, s, lattice k) into one shared block and only the block name crosses the pipe
+- Keeps the generation work off the render process's GIL
+"""
+import logging
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from penrose_tools.TileStore import TileStore, generate_tiles
+
+# Column layout of a shared result block: (name, dtype, per-tile shape)
+_COLUMNS = (
+    ('r', np.int8, ()),
+    ('s', np.int8, ()),
+    ('k', np.int32, (5,)),
+)
+
+def _column_offsets(n):
+    """Byte offset of each column in a block holding n tiles (8-byte aligned)."""
+    offsets = []
+    pos = 0
+    for _name, dtype, shape in _COLUMNS:
+        offsets.append(pos)
+        size = n * np.dtype(dtype).itemsize * int(np.prod(shape, dtype=np.int64))
+        pos += (size + 7) & ~7
+    return offsets, pos
+
+
+def _generate_rect(job):
+    """Pool job: generate tiles for bounds and publish them in shared memory.
+    Returns (block_name, tile_count); block_name is None when there are no tiles.
+    """
+    bounds, gamma = job
+    store = generate_tiles(bounds, gamma)
+    n = len(store)
+    if n == 0:
+        return None, 0
+
+    offsets, total = _column_offsets(n)
+    shm = shared_memory.SharedMemory(create=True, size=total)
+    try:
+        for (name, dtype, shape), offset in zip(_COLUMNS, offsets):
+            dst = np.ndarray((n,) + shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            dst[...] = getattr(store, name)
+            del dst
+        return shm.name, n
+    finally:
+        shm.close()
+
+
+class TileWorkerPool:
+    """
+    Persistent process pool that generates tile rectangles in parallel.
+    Uses the 'fork' start method so workers don't re-import the application
+    entry point; unavailable platforms raise RuntimeError on construction.
+    """
+
+    def __init__(self, workers):
+        self.logger = logging.getLogger('TileWorkerPool')
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("TileWorkerPool requires the 'fork' start method")
+        self.workers = workers
+        # Start the tracker before forking so workers and the parent share it
+        # (blocks are created in workers and unlinked here)
+        resource_tracker.ensure_running()
+        ctx = multiprocessing.get_context('fork')
+        self._pool = ctx.Pool(workers)
+        self.logger.info(f"Tile worker pool started ({workers} processes)")
+
+    def generate(self, jobs, gamma, consume, cancelled=None):
+        """Generate every bounds in jobs on the pool.
+
+        jobs is a list of (bounds, tag). For each finished job,
+        consume(store, tag) is called with a TileStore whose columns are views
+        into the shared block; the block is released as soon as consume
+        returns, so consume must copy anything it keeps. Once cancelled()
+        returns True the remaining results are released without being consumed.
+        Returns False if the run was cancelled. If a job or consume raises,
+        the outstanding blocks are released before the error propagates.
+        """
+        tags = [tag for _bounds, tag in jobs]
+        results = self._pool.imap(_generate_rect, [(bounds, gamma) for bounds, _tag in jobs])
+        try:
+            for tag, (block_name, n) in zip(tags, results):
+                if cancelled is not None and cancelled():
+                    if block_name is not None:
+                        self._release(shared_memory.SharedMemory(name=block_name))
+                    return False
+                if block_name is None:
+                    consume(TileStore.empty(), tag)
+                    continue
+
+                shm = shared_memory.SharedMemory(name=block_name)
+                try:
+                    store = self._attach(shm, n)
+                    consume(store, tag)
+                    del store
+                finally:
+                    self._release(shm)
+            return True
+        finally:
+            # After a cancel or an error (in a worker or in consume) the
+            # remaining jobs still publish blocks: wait for them and unlink
+            self._drain(results)
+
+    def _drain(self, results):
+        """Release the blocks of every result not yet taken from results."""
+        while True:
+            try:
+                block_name, _n = next(results)
+            except StopIteration:
+                return
+            except Exception as e:
+                self.logger.warning(f"Tile worker job failed: {e}")
+                continue
+            if block_name is not None:
+                self._release(shared_memory.SharedMemory(name=block_name))
+
+    def _release(self, shm):
+        """Unlink a result block and drop this process's mapping."""
+        shm.unlink()
+        try:
+            shm.close()
+        except BufferError:
+            # A caller kept a view; the mapping goes away with it
+            self.logger.warning("Shared tile block still referenced after consume")
+
+    @staticmethod
+    def _attach(shm, n):
+        offsets, _total = _column_offsets(n)
+        cols = [np.ndarray((n,) + shape, dtype=dtype, buffer=shm.buf, offset=offset)
+                for (_name, dtype, shape), offset in zip(_COLUMNS, offsets)]
+        return TileStore(*cols)
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Checks TileDataManager's star/starburst detection on the CPU: the analytic
+neighbor graph must give the same patterns as edge hashing, and both must
+match the reference recorded from the per-tile (pre-TileStore) detector in
+test_pattern_detection_reference.npz.
+
+Run with: python -m pytest -q test_pattern_detection.py
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from penrose_tools.TileDataManager import TileDataManager
+from penrose_tools.TileStore import generate_tiles, pack_keys
+
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'test_pattern_detection_reference.npz')
+REFERENCE_BOUNDS = (-3.0, -2.0, 3.0, 2.0)
+
+# [0.5] * 5 is the starburst gamma; the others give stars only
+GAMMAS = [
+    [0.2] * 5,
+    [0.5] * 5,
+    [0.13, -0.27, 0.31, 0.05, -0.22],
+    [0.1, 0.2, -0.3, 0.05, -0.05],
+]
+
+
+def detect(manager, gamma, bounds, analytic):
+    store = generate_tiles(bounds, gamma)
+    if analytic:
+        dart_count = manager._analytic_neighbors(store, gamma)
+    else:
+        manager._calculate_neighbors(store)
+        dart_count = None
+    stars, bursts, _, pattern_type, blend_factor = manager._detect_patterns(store, dart_count)
+    return store, stars, bursts, pattern_type, blend_factor
+
+
+@pytest.fixture(scope='module')
+def manager():
+    return TileDataManager()
+
+
+@pytest.mark.parametrize('bounds', [(-2.0, -2.0, 2.0, 2.0), REFERENCE_BOUNDS])
+@pytest.mark.parametrize('gamma', GAMMAS)
+def test_analytic_neighbors_match_edge_hashing(manager, gamma, bounds):
+    _, stars, bursts, pattern_type, blend_factor = detect(manager, gamma, bounds, analytic=False)
+    _, a_stars, a_bursts, a_pattern_type, a_blend_factor = detect(manager, gamma, bounds, analytic=True)
+
+    assert (a_stars, a_bursts) == (stars, bursts)
+    np.testing.assert_array_equal(a_pattern_type, pattern_type)
+    np.testing.assert_allclose(a_blend_factor, blend_factor, atol=1e-6)
+
+
+@pytest.mark.parametrize('analytic', [False, True])
+@pytest.mark.parametrize('case', range(len(GAMMAS)))
+def test_patterns_match_reference(manager, case, analytic):
+    reference = np.load(REFERENCE)
+    gamma = reference[f'gamma_{case}'].tolist()
+    assert gamma == GAMMAS[case]
+
+    store, stars, bursts, pattern_type, blend_factor = detect(
+        manager, gamma, REFERENCE_BOUNDS, analytic)
+    assert [stars, bursts] == reference[f'counts_{case}'].tolist()
+
+    ref_keys = reference[f'keys_{case}']
+    assert len(store) == len(ref_keys)
+    index = store.index_of(pack_keys(*ref_keys.T))
+    assert (index >= 0).all()
+    np.testing.assert_allclose(pattern_type[index], reference[f'pattern_type_{case}'], atol=1e-6)
+    np.testing.assert_allclose(blend_factor[index], reference[f'blend_factor_{case}'], atol=1e-6)
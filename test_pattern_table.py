@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Checks that the region_blend texture fallback covers the viewport: every
+pixel's tile, as findTile() in pentagrid_common.glsl locates it, must be
+found in the packed pattern table. Runs on the CPU (no GL context needed).
+
+Run with: python -m pytest -q test_pattern_table.py
+"""
+
+import logging
+
+import numpy as np
+import pytest
+
+from penrose_tools.Operations import Operations
+from penrose_tools.PatternHash import probe
+from penrose_tools.ProceduralRenderer import ProceduralRenderer
+from penrose_tools.TileStore import locate_keys, unpack_keys
+
+WIDTH, HEIGHT = 320, 240
+GAMMA = [0.13, -0.27, 0.31, 0.05, -0.22]
+
+# ProceduralRenderer.__del__ asks GLFW for a context, which warns without glfw.init()
+pytestmark = pytest.mark.filterwarnings('ignore::glfw.GLFWError')
+
+
+def fallback_renderer():
+    """A ProceduralRenderer with just the CPU state the fallback uses."""
+    renderer = ProceduralRenderer.__new__(ProceduralRenderer)
+    renderer.logger = logging.getLogger('ProceduralRenderer')
+    renderer.operations = Operations()
+    renderer.tile_manager = None
+    return renderer
+
+
+def pixel_points(camera_x, camera_y, zoom, samples=48):
+    """Camera-space points of a pixel grid over the viewport, edges included
+    (p = uv * (3.0 / u_zoom) + u_camera, as in region_blend.frag)."""
+    u = np.linspace(-0.5, 0.5, samples) * (WIDTH / HEIGHT)
+    v = np.linspace(-0.5, 0.5, samples)
+    uu, vv = np.meshgrid(u, v)
+    return np.stack([uu.ravel(), vv.ravel()], axis=1) * (3.0 / zoom) + (camera_x, camera_y)
+
+
+@pytest.mark.parametrize('camera_x, camera_y, zoom', [
+    (0.0, 0.0, 1.0),
+    (2.0, 0.0, 1.0),
+    (5.0, -3.0, 2.0),
+    (-7.3, 11.6, 0.7),
+])
+def test_pixel_tiles_are_in_pattern_table(camera_x, camera_y, zoom):
+    renderer = fallback_renderer()
+    tiles = renderer._generate_tiles_for_viewport(WIDTH, HEIGHT, GAMMA, camera_x, camera_y, zoom)
+    patterns = renderer._detect_patterns(tiles)
+    table, max_probe = renderer._pack_pattern_texture(patterns)
+
+    keys = locate_keys(pixel_points(camera_x, camera_y, zoom), GAMMA)
+    assert (keys >= 0).all()
+    missing = [key for key in zip(*(c.tolist() for c in unpack_keys(np.unique(keys))))
+               if probe(table, max_probe, *key) is None]
+    assert not missing